@@ -1,7 +1,12 @@
 #!/usr/bin/env python3
 import sys
+from functools import partial
 from pathlib import Path
-import pdfplumber
+
+# пакет kumex лежит в ../src
+sys.path.append(str(Path(__file__).resolve().parent.parent / "src"))
+
+from kumex.io.pdf_reader import iter_pdf_batch, read_pdf_words
 
 def main():
     folder = Path.cwd()
@@ -12,31 +17,24 @@ def main():
         print("В этой папке PDF не найдено.")
         return
 
+    # извлекаем слова с координатами параллельно (по процессу на ядро), пишем по порядку файлов
+    reader = partial(read_pdf_words, extra_attrs=["x0", "x1", "top", "bottom"])
+
     with out_path.open("w", encoding="utf-8", newline="") as f:
         f.write("file\tpage\tx0\ty0\tx1\ty1\ttext\n")
 
-        for pdf_path in pdf_files:
-            try:
-                with pdfplumber.open(pdf_path) as pdf:
-                    for pageno, page in enumerate(pdf.pages, start=1):
-                        # извлекаем слова с координатами
-                        words = page.extract_words(
-                            use_text_flow=True,
-                            keep_blank_chars=False,
-                            extra_attrs=["x0", "x1", "top", "bottom"]
-                        )
-                        # сортировка: сверху-вниз, слева-направо
-                        words.sort(key=lambda w: (w["top"], w["x0"]))
-
-                        for w in words:
-                            txt = (w.get("text") or "").replace("\t", " ").replace("\r", " ").replace("\n", " ")
-                            f.write(f"{pdf_path.name}\t{pageno}\t{w['x0']:.2f}\t{w['top']:.2f}\t{w['x1']:.2f}\t{w['bottom']:.2f}\t{txt}\n")
-            except Exception as e:
+        for path, words, error in iter_pdf_batch(reader, pdf_files, ordered=True):
+            name = Path(path).name
+            if error is not None:
                 # если какой-то PDF не читается, зафиксируем и пойдём дальше
-                with out_path.open("a", encoding="utf-8") as ferr:
-                    ferr.write(f"{pdf_path.name}\tERROR\t0\t0\t0\t0\t{e}\n")
+                f.write(f"{name}\tERROR\t0\t0\t0\t0\t{error}\n")
+                continue
+            # слова уже отсортированы: сверху-вниз, слева-направо
+            for pageno, x0, top, x1, bottom, text in words:
+                txt = text.replace("\t", " ").replace("\r", " ").replace("\n", " ")
+                f.write(f"{name}\t{pageno}\t{x0:.2f}\t{top:.2f}\t{x1:.2f}\t{bottom:.2f}\t{txt}\n")
 
     print(f"Готово. Результат: {out_path}")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -1,22 +1,49 @@
 """
 Kumex — точка входа утилиты.
+
+Ключ --startup-report: замер холодного старта (этапы + время импортов модулей),
+отчёт пишется в %APPDATA%\\Kumex\\kumex_startup.txt (и в консоль, если она есть).
 """
 
 import sys
 import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from kumex.startup import StartupReport
+# замер начинается до тяжёлых импортов (в процессах пула разбора — не нужен)
+_report = StartupReport.begin() if __name__ == "__main__" and "--startup-report" in sys.argv[1:] else None
+
+import multiprocessing
 import tkinter as tk
 from kumex.ui.main_window import MainWindow
 
 
+def _finish_report(report):
+    from kumex.io.file_ops import default_state_dir
+
+    report.mark("esimene joonistus (mainloop)")
+    path = default_state_dir() / "kumex_startup.txt"
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        path = None
+    report.finish(path)
+
+
 def main():
+    if _report is not None:
+        _report.mark("impordid")
     root = tk.Tk()
     root.title("Kumex")
     app = MainWindow(root)
     app.pack(fill="both", expand=True)
+    if _report is not None:
+        _report.mark("aken ehitatud")
+        root.after_idle(_finish_report, _report)
     root.mainloop()
 
 
 if __name__ == "__main__":
+    # нужно для пула процессов разбора PDF в сборке PyInstaller (Windows, spawn)
+    multiprocessing.freeze_support()
     main()
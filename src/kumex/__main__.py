@@ -0,0 +1,9 @@
+"""
+python -m kumex — то же, что консольная команда kumex.
+"""
+import sys
+
+from kumex.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,193 @@
+"""
+Микробенчмарки (kumex bench ...): скорость разбора строк PDF и запуска до/после изменений.
+"""
+import os
+import random
+import tempfile
+import time
+from pathlib import Path
+
+from kumex.core.formulas import UOM_MM, Consumption, consumption_batch, consumption_row
+from kumex.core.ledger import (
+    keep_stock_materials, normalize_stock_data, recompute_balances, verify_balances,
+)
+from kumex.core.parser import (
+    MATERIALS, ParsedRow, classify_material, date_rx, parse_text, po_rx, qty_any_rx, qty_row_above_rx, size_rx,
+)
+from kumex.io.ledger_store import LedgerStore, open_store
+from kumex.io.state_repo import StateRepository
+
+
+# ---------- прежний разбор (эталон «до») ----------
+
+def _find_qty_legacy(lines: list, i: int):
+    n = len(lines)
+    m = qty_any_rx.search(lines[i])
+    if m:
+        return int(m.group(1))
+    for j in range(1, 4):
+        if i + j >= n:
+            break
+        m = qty_any_rx.search(lines[i + j])
+        if m:
+            return int(m.group(1))
+    for j in (1, 2):
+        if i - j >= 0:
+            m = qty_row_above_rx.match(lines[i - j])
+            if m:
+                return int(m.group(1))
+    return None
+
+
+def parse_text_legacy(text: str) -> list:
+    """Разбор до однопроходного классификатора: окно qty — отдельными поисками для каждой позиции."""
+    if not text:
+        return []
+    m = po_rx.search(text)
+    po = m.group(1) if m else "?"
+    m = date_rx.search(text)
+    od = m.group(1) if m else "?"
+    lines = [ln.strip() for ln in text.splitlines()]
+    rows = []
+    for i, line in enumerate(lines):
+        if not size_rx.search(line):
+            continue
+        qty = _find_qty_legacy(lines, i)
+        if qty is None:
+            continue
+        rows.append(ParsedRow(desc=line, qty=qty, po=po, date=od, material=classify_material(line), line=i))
+    return rows
+
+
+# ---------- измерение ----------
+
+def _time_parse(func, texts, repeat: int) -> float:
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        for t in texts:
+            func(t)
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best
+
+
+def bench_parse(texts, repeat: int = 20) -> dict:
+    """Строк в секунду (лучший из repeat прогонов) для прежнего и текущего разбора."""
+    texts = [t or "" for t in texts]
+    n_lines = sum(len(t.splitlines()) for t in texts)
+    legacy = [[r.to_dict() for r in parse_text_legacy(t)] for t in texts]
+    current = [[r.to_dict() for r in parse_text(t)] for t in texts]
+    out = {"files": len(texts), "lines": n_lines, "same_rows": legacy == current}
+    for name, func in (("legacy", parse_text_legacy), ("current", parse_text)):
+        dt = _time_parse(func, texts, repeat)
+        out[name] = n_lines / dt if dt > 0 else 0.0
+    return out
+
+
+# ---------- запуск: состояние склада ----------
+
+def make_stock(state_dir, n_records: int):
+    """kumex_stock.json с n_records записями ledger (пополнения и расчёты месяцев)."""
+    data = normalize_stock_data({})
+    ledger = data["ledger"]
+    for i in range(n_records):
+        month = f"{2000 + i // 1200:04d}-{i // 100 % 12 + 1:02d}"
+        typ = "manual_add" if i % 3 == 0 else "month_calc"
+        ledger.append({"ts": f"{month}-01T08:00:00", "month": month, "material": MATERIALS[i % len(MATERIALS)],
+                       "type": typ, "amount_m2": 1.25 if typ == "manual_add" else 0.5, "note": ""})
+    recompute_balances(data)
+    LedgerStore(Path(state_dir) / "kumex_stock.json").save_snapshot(data)
+
+
+def startup_state(state_dir, backend: str = "json", legacy: bool = False) -> dict:
+    """Часть запуска MainWindow, касающаяся склада (без Tk).
+
+    legacy=True — как раньше: снимок переписывается при каждом запуске.
+    """
+    state = StateRepository(open_store(state_dir, backend))
+    data = state.get()
+    keep_stock_materials(data)
+    if not verify_balances(data):
+        recompute_balances(data)
+    if legacy:
+        state.save_snapshot()
+    else:
+        state.save_if_dirty()
+    return data
+
+
+def _stock_sig(state_dir, backend):
+    # у SQLite запись может остаться в -wal до checkpoint
+    names = ("kumex_stock.sqlite3", "kumex_stock.sqlite3-wal") if backend == "sqlite" else ("kumex_stock.json",)
+    sig = []
+    for name in names:
+        try:
+            st = os.stat(Path(state_dir) / name)
+        except OSError:
+            sig.append(None)
+            continue
+        sig.append((st.st_mtime_ns, st.st_size))
+    return tuple(sig)
+
+
+def bench_startup(sizes, backend: str = "json", repeat: int = 5) -> list:
+    """Время запуска (мс, лучший из repeat) по размеру ledger: прежний и текущий; писался ли файл."""
+    out = []
+    for n in sizes:
+        with tempfile.TemporaryDirectory() as tmp:
+            make_stock(tmp, n)
+            startup_state(tmp, backend)       # миграция в SQLite, если нужна
+            res = {"records": n}
+            for name, legacy in (("legacy", True), ("current", False)):
+                best = None
+                for _ in range(repeat):
+                    before = _stock_sig(tmp, backend)
+                    t0 = time.perf_counter()
+                    startup_state(tmp, backend, legacy=legacy)
+                    dt = time.perf_counter() - t0
+                    best = dt if best is None else min(best, dt)
+                res[name] = best * 1000
+                res[name + "_writes"] = _stock_sig(tmp, backend) != before
+            out.append(res)
+    return out
+
+
+# ---------- расход по Formulas.md: построчно и пакетом ----------
+
+def synthetic_items(n: int, seed: int = 1) -> tuple:
+    """n позиций (a, b, c, qty, uom): в основном детали из плит 52 мм, часть метражных и с ошибками."""
+    rnd = random.Random(seed)
+    a, b, c, qty, uom = [], [], [], [], []
+    for _ in range(n):
+        dims = [rnd.choice((52, 52, 42, 32, 20)), rnd.randint(10, 600), rnd.randint(10, 2000)]
+        if rnd.random() < 0.02:
+            dims[0] = rnd.randint(53, 120)      # нет стороны ≤ 52
+        rnd.shuffle(dims)
+        mm = rnd.random() < 0.2
+        a.append(dims[0])
+        b.append(dims[1])
+        c.append(dims[2])
+        qty.append(rnd.randint(500, 6000) if mm else rnd.randint(0 if rnd.random() < 0.01 else 1, 200))
+        uom.append(UOM_MM if mm else "")
+    return a, b, c, qty, uom
+
+
+def bench_formulas(n: int = 100_000, repeat: int = 5) -> dict:
+    """Строк в секунду: эталонный consumption_row по строкам и consumption_batch."""
+    items = synthetic_items(n)
+    ref = [consumption_row(*r) for r in zip(*items)]
+    batch = consumption_batch(*items)
+    same = all(
+        [int(x) for x in batch[name]] == [getattr(r, name) for r in ref] for name in Consumption._fields)
+    out = {"rows": n, "same": same}
+    for name, func in (("scalar", lambda: [consumption_row(*r) for r in zip(*items)]),
+                       ("batch", lambda: consumption_batch(*items))):
+        best = None
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            func()
+            dt = time.perf_counter() - t0
+            best = dt if best is None else min(best, dt)
+        out[name] = n / best if best > 0 else 0.0
+    return out
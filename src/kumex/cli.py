@@ -0,0 +1,271 @@
+"""
+Kumex без GUI: пакетный расчёт расхода по месяцам (для ночных заданий на сервере).
+
+Пример:
+    kumex calc "//server/Material Tellimused/Tellimus" 2025-09 --kerf 1.0 --out reports
+    kumex calc ./pdf 2024 --write-ledger          # все 12 месяцев года
+"""
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+
+from kumex.core.aggregator import parse_kerf
+from kumex.core.fixed import format_units
+from kumex.core.ledger import close_month_events, is_month_closed
+from kumex.core.layout_parser import parse_layout
+from kumex.core.parser import MATERIALS, PARSER_BACKENDS, ParsedRow, parse_order_month, parse_text
+from kumex.core.report import generate_report
+from kumex.core.row_store import RowStore
+from kumex.io.file_ops import default_state_dir, load_json
+from kumex.io.ledger_store import BACKENDS, open_store
+from kumex.io.parse_cache import ParseCache, cache_variant
+from kumex.io.pdf_reader import PROFILES, read_pdf_layout, read_pdf_text, read_pdf_texts
+from kumex.io.pdf_index import MONTH_MODES, PdfIndex
+
+_month_rx = re.compile(r"^(\d{4})(?:-(\d{2}))?$")
+
+
+def _expand_months(values) -> list:
+    """"2025-09" -> [(2025, 9)], "2025" -> все месяцы года."""
+    out = []
+    for v in values:
+        m = _month_rx.match(v.strip())
+        if not m:
+            raise argparse.ArgumentTypeError(f"oodatud YYYY-MM või YYYY, saadi: {v}")
+        yy = int(m.group(1))
+        if m.group(2):
+            mm = int(m.group(2))
+            if not 1 <= mm <= 12:
+                raise argparse.ArgumentTypeError(f"vale kuu: {v}")
+            out.append((yy, mm))
+        else:
+            out.extend((yy, mm) for mm in range(1, 13))
+    # один и тот же месяц дважды не считаем (иначе двойное списание в ledger)
+    return list(dict.fromkeys(out))
+
+
+def _parse_files(files, cache, workers, profile, index=None, backend="text") -> tuple:
+    """Строки всех файлов (кэш + пул процессов для остальных). Возвращает (rows, errors)."""
+    by_file = {}
+    misses = []
+    for p in files:
+        hit = cache.get(p, st=index.stat(p) if index else None) if cache is not None else None
+        if hit is None:
+            misses.append(p)
+        else:
+            by_file[str(p)] = [ParsedRow.from_dict(d) for d in hit.get("rows", [])]
+
+    errors = []
+    reader = read_pdf_layout if backend == "layout" else read_pdf_text
+    for path, data, error in read_pdf_texts(misses, workers=workers, ordered=False, profile=profile, reader=reader):
+        if error is not None:
+            errors.append((path, error))
+            continue
+        if backend == "layout":
+            rows, text = parse_layout(data or [])
+        else:
+            text = data or ""
+            rows = parse_text(text)
+        by_file[path] = rows
+        if cache is not None:
+            cache.put(path, [r.to_dict() for r in rows], order_month=parse_order_month(text))
+
+    # порядок строк — как в GUI: по имени файла
+    rows = RowStore(r for p in files for r in by_file.get(str(p), []))
+    return rows, errors
+
+
+def _month_files(args, index, cache, folder, yy, mm) -> tuple:
+    """PDF месяца и их строки; в режиме order_date лишние кандидаты отсекаются после разбора."""
+    profile = PROFILES[args.profile]
+    if args.month_by != "order_date":
+        files = index.month_files(folder, yy, mm)
+        return (files,) + _parse_files(files, cache, args.workers, profile, index, args.parser)
+    month = f"{yy}-{mm:02d}"
+    files = index.order_date_files(folder, yy, mm, cache)
+    _parse_files(files, cache, args.workers, profile, index, args.parser)
+    files = [p for p in files if index.doc_month(p, cache) == month]
+    return (files,) + _parse_files(files, cache, args.workers, profile, index, args.parser)
+
+
+def _cmd_calc(args) -> int:
+    folder = Path(args.pdf_dir).expanduser()
+    if not folder.is_dir():
+        print(f"Kausta ei eksisteeri: {folder}", file=sys.stderr)
+        return 2
+    months = _expand_months(args.months)
+    state_dir = Path(args.state_dir) if args.state_dir else default_state_dir()
+    config = load_json(state_dir / "kumex_config.json", default={})
+    # толщина пилы — как в GUI (ключ "kerf_mm", по умолчанию 1 мм), если не задана явно
+    kerf = parse_kerf(args.kerf if args.kerf is not None else config.get("kerf_mm", 1))
+    args.month_by = args.month_by or config.get("month_by", "mtime")
+    if args.month_by not in MONTH_MODES:
+        args.month_by = "mtime"
+    if args.month_by == "order_date" and args.no_cache:
+        # даты заказов хранятся в кэше разбора
+        print("--month-by order_date vajab parsimise vahemälu (ilma --no-cache)", file=sys.stderr)
+        return 2
+    args.parser = args.parser or config.get("parser_backend", "text")
+    if args.parser not in PARSER_BACKENDS:
+        args.parser = "text"
+
+    cache = None
+    if not args.no_cache:
+        cache = ParseCache(state_dir / "kumex_parse_cache.json", variant=cache_variant(args.profile, args.parser))
+
+    # хранилище — как в GUI (ключ "storage" в kumex_config.json), если не задано явно
+    backend = args.storage or config.get("storage", "json")
+    if backend not in BACKENDS:
+        backend = "json"
+    store = open_store(state_dir, backend)
+    # первая сверка в запуске — полный scandir (размер/mtime каждого файла), месяцы — из индекса
+    index = PdfIndex(state_dir / "kumex_pdf_index.json")
+    index.refresh(folder)
+    if cache is not None and index.checked(folder):
+        cache.prune_folder(folder, index.files(folder))
+    stock = store.load() if args.write_ledger else None
+
+    print("month\tpdf\trows\t" + "\t".join(MATERIALS) + "\tsec\tpdf/s")
+    t_all = time.perf_counter()
+    n_files = 0
+    rc = 0
+    for yy, mm in months:
+        month = f"{yy}-{mm:02d}"
+        t0 = time.perf_counter()
+        files, rows, errors = _month_files(args, index, cache, folder, yy, mm)
+        totals = rows.totals(kerf)
+        dt = time.perf_counter() - t0
+        n_files += len(files)
+
+        cols = "\t".join(format_units(totals[name]) for name in MATERIALS)
+        rate = len(files) / dt if dt > 0 else 0.0
+        print(f"{month}\t{len(files)}\t{len(rows)}\t{cols}\t{dt:.2f}\t{rate:.1f}")
+        for path, error in errors:
+            print(f"  viga: {path}: {error}", file=sys.stderr)
+            rc = 1
+
+        if args.out:
+            generate_report(totals, month, args.out,
+                            rows=rows if args.rows else None)
+
+        if stock is not None:
+            # как в GUI: месяц закрывается только по полному разбору (кнопка «Arvuta»
+            # недоступна, пока разбор идёт) — неполные итоги в ledger не пишем
+            if is_month_closed(stock, month):
+                print(f"  kuu {month} on juba suletud — ledger'it ei muudeta", file=sys.stderr)
+            elif errors:
+                print(f"  kuu {month}: {len(errors)} PDF-i ei õnnestunud lugeda — ledger'it ei muudeta",
+                      file=sys.stderr)
+            elif not files:
+                print(f"  kuu {month}: PDF-e pole — ledger'it ei muudeta", file=sys.stderr)
+            else:
+                store.commit(stock, close_month_events(month, totals))
+
+    # ledger: события уже в журнале (store.commit), снимок — уплотнением хранилища
+    if cache is not None:
+        cache.save()
+    index.save()
+
+    dt = time.perf_counter() - t_all
+    rate = n_files / dt if dt > 0 else 0.0
+    print(f"# kokku: {n_files} PDF, {dt:.2f} s, {rate:.1f} PDF/s", file=sys.stderr)
+    return rc
+
+
+def _cmd_bench_parse(args) -> int:
+    from kumex.bench import bench_parse
+
+    folder = Path(args.pdf_dir).expanduser()
+    files = sorted(folder.glob("*.pdf"), key=lambda x: (x.name.lower(), x.name))
+    if not files:
+        print(f"PDF-faile ei leitud: {folder}", file=sys.stderr)
+        return 2
+    texts = [text for _path, text, error in read_pdf_texts(files, workers=args.workers,
+                                                           profile=PROFILES[args.profile]) if error is None]
+    res = bench_parse(texts, repeat=args.repeat)
+    print(f"{res['files']} PDF, {res['lines']} rida, sama tulemus: {'jah' if res['same_rows'] else 'EI'}")
+    print(f"enne:  {res['legacy']:12.0f} rida/s")
+    print(f"pärast: {res['current']:11.0f} rida/s  (x{res['current'] / res['legacy']:.2f})")
+    return 0 if res["same_rows"] else 1
+
+
+def _cmd_bench_startup(args) -> int:
+    from kumex.bench import bench_startup
+
+    print(f"ledger\tenne ms\tkirjutab\tpärast ms\tkirjutab  ({args.storage})")
+    for res in bench_startup(args.sizes, backend=args.storage, repeat=args.repeat):
+        print(f"{res['records']}\t{res['legacy']:.1f}\t{'jah' if res['legacy_writes'] else 'ei'}\t"
+              f"{res['current']:.1f}\t{'jah' if res['current_writes'] else 'ei'}")
+    return 0
+
+
+def _cmd_bench_formulas(args) -> int:
+    from kumex.bench import bench_formulas
+    from kumex.core.formulas import np
+
+    res = bench_formulas(args.rows, repeat=args.repeat)
+    print(f"{res['rows']} rida, sama tulemus: {'jah' if res['same'] else 'EI'}"
+          + ("" if np is not None else " (numpy puudub — pakett arvutab ridade kaupa)"))
+    print(f"ridade kaupa: {res['scalar']:12.0f} rida/s")
+    print(f"pakett:       {res['batch']:12.0f} rida/s  (x{res['batch'] / res['scalar']:.1f})")
+    return 0 if res["same"] else 1
+
+
+def build_parser() -> argparse.ArgumentParser:
+    ap = argparse.ArgumentParser(prog="kumex", description="Kumex — materjalikulu arvestus (m²) ilma GUI-ta.")
+    sub = ap.add_subparsers(dest="command", required=True)
+
+    calc = sub.add_parser("calc", help="PDF-kausta kuu(de) arvestus")
+    calc.add_argument("pdf_dir", help="PDF-failide kaust")
+    calc.add_argument("months", nargs="+", help="YYYY-MM või YYYY (kõik kuud)")
+    calc.add_argument("--kerf", default=None,
+                      help="saetera paksus, mm (vaikimisi nagu kumex_config.json-is, muidu 1)")
+    calc.add_argument("--workers", type=int, default=None, help="protsesside arv (vaikimisi tuumade arv)")
+    calc.add_argument("--profile", choices=sorted(PROFILES), default="order", help="PDF-i lugemise profiil")
+    calc.add_argument("--no-cache", action="store_true", help="ära kasuta parsimise vahemälu")
+    calc.add_argument("--state-dir", default=None, help="oleku kaust (vaikimisi %%APPDATA%%\\Kumex)")
+    calc.add_argument("--parser", choices=PARSER_BACKENDS, default=None,
+                      help="parsimine: tekst või sõnade koordinaadid (vaikimisi nagu kumex_config.json-is)")
+    calc.add_argument("--month-by", choices=MONTH_MODES, default=None,
+                      help="kuu määramine: faili muutmisaeg või tellimuse kuupäev (vaikimisi nagu kumex_config.json-is)")
+    calc.add_argument("--storage", choices=BACKENDS, default=None,
+                      help="lao andmete hoidla (vaikimisi nagu kumex_config.json-is)")
+    calc.add_argument("--out", default=None, help="kaust JSON/CSV aruannete jaoks")
+    calc.add_argument("--rows", action="store_true", help="lisa aruandesse kõik read")
+    calc.add_argument("--write-ledger", action="store_true",
+                      help="kirjuta month_calc ledger'isse ja sulge kuu (nagu nupp „Arvuta“)")
+    calc.set_defaults(func=_cmd_calc)
+
+    bench = sub.add_parser("bench", help="mõõtmised")
+    bench_sub = bench.add_subparsers(dest="bench", required=True)
+    bp = bench_sub.add_parser("parse", help="PDF-teksti parsimise kiirus (rida/s), enne ja pärast")
+    bp.add_argument("pdf_dir", help="PDF-failide kaust (nt Kättesaamine)")
+    bp.add_argument("--repeat", type=int, default=20, help="kordusi (parim aeg)")
+    bp.add_argument("--workers", type=int, default=None, help="protsesside arv teksti lugemiseks")
+    bp.add_argument("--profile", choices=sorted(PROFILES), default="order", help="PDF-i lugemise profiil")
+    bp.set_defaults(func=_cmd_bench_parse)
+    bs = bench_sub.add_parser("startup", help="käivituse (lao oleku) aeg sõltuvalt ledger'i suurusest")
+    bs.add_argument("--sizes", type=int, nargs="+", default=[0, 1000, 10000, 100000], help="ledger'i kirjete arvud")
+    bs.add_argument("--storage", choices=BACKENDS, default="json", help="lao andmete hoidla")
+    bs.add_argument("--repeat", type=int, default=5, help="kordusi (parim aeg)")
+    bs.set_defaults(func=_cmd_bench_startup)
+    bf = bench_sub.add_parser("formulas", help="Formulas.md kulu arvutus: ridade kaupa vs NumPy pakett")
+    bf.add_argument("--rows", type=int, default=100_000, help="sünteetiliste ridade arv")
+    bf.add_argument("--repeat", type=int, default=5, help="kordusi (parim aeg)")
+    bf.set_defaults(func=_cmd_bench_formulas)
+    return ap
+
+
+def main(argv=None) -> int:
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args)
+    except argparse.ArgumentTypeError as e:
+        print(f"kumex: {e}", file=sys.stderr)
+        return 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
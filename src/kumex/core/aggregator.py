@@ -1,6 +1,57 @@
 """
-Агрегатор данных (материал, размеры, объёмы).
+Агрегатор данных: толщина пилы и стороны детали по описанию.
+
+Суммы площадей по материалам считает kumex.core.row_store (целые мм, kumex.core.fixed).
 """
-def aggregate(parsed_items):
-    # TODO: реализовать агрегацию
-    return {}
+import re
+from decimal import Decimal
+from functools import lru_cache
+
+_num_rx = re.compile(r"\d+")
+
+# сколько различных описаний помнит plate_sides (в месяце их обычно десятки–сотни)
+SIDES_CACHE_SIZE = 4096
+
+
+def parse_kerf(raw) -> Decimal:
+    """Толщина пилы (мм) из строки поля ввода; мусор/отрицательное -> 0."""
+    try:
+        kerf = Decimal(str(raw).replace(",", ".").strip())
+    except Exception:
+        return Decimal("0")
+    if not kerf.is_finite() or kerf < 0:
+        return Decimal("0")
+    return kerf
+
+
+@lru_cache(maxsize=SIDES_CACHE_SIZE)
+def plate_sides(desc: str):
+    """Стороны детали (A, B) в плоскости плиты 52 мм или None, если размеры не распознаны.
+
+    Результат запоминается по строке описания: одни и те же позиции повторяются
+    из заказа в заказ, а пересчёт (толщина пилы, новый месяц) разбирает их снова.
+    """
+    # извлечь все числа
+    nums = [int(x) for x in _num_rx.findall(desc)]
+    if len(nums) < 3:
+        return None
+
+    # считаем количество "52"
+    cnt_52 = nums.count(52)
+
+    if cnt_52 == 1:
+        sides = [x for x in nums if x != 52]
+        if len(sides) >= 2:
+            return sides[0], sides[1]
+        return None
+    if cnt_52 == 2:
+        non52 = [x for x in nums if x != 52]
+        if len(non52) == 1:
+            return 52, non52[0]
+        return None
+    if cnt_52 == 3:
+        return 52, 52
+    # ни одного 52 → берём 2 самые большие стороны
+    sides = sorted(nums, reverse=True)
+    return sides[0], sides[1]
+
@@ -0,0 +1,74 @@
+"""
+Фиксированная точка для площадей: целые сотые м² вместо Decimal/float.
+
+Единица журнала, остатков и вывода — 0.01 м² (UNITS_PER_M2 = 100), в JSON
+остатки пишутся строкой "12.34" (читается и прежним кодом как Decimal).
+Расчёт по размерам идёт в целых мм² (с толщиной пилы — в мкм², пила
+задаётся в мкм): сумма точная, округление до 0.01 м² одно — в конце,
+half-up от нуля, как Decimal.quantize(ROUND_HALF_UP) раньше.
+"""
+import re
+from decimal import Decimal, ROUND_HALF_UP
+
+UNITS_PER_M2 = 100
+# мкм в мм (толщина пилы — целые мкм)
+KERF_SCALE = 1000
+# мкм² в единице (0.01 м² = 10^4 мм² = 10^10 мкм²)
+UM2_PER_UNIT = 10_000 * KERF_SCALE * KERF_SCALE
+
+_dec_rx = re.compile(r"^([+-]?)([0-9]*)(?:\.([0-9]*))?$")
+
+
+def div_round(num: int, den: int) -> int:
+    """num / den с округлением половины от нуля (den > 0)."""
+    q, r = divmod(abs(num), den)
+    if 2 * r >= den:
+        q += 1
+    return q if num >= 0 else -q
+
+
+def parse_units(value) -> int:
+    """Площадь в м² (int/float/str/Decimal, "12,5") -> сотые м²; ValueError, если не число."""
+    if isinstance(value, int):
+        return value * UNITS_PER_M2
+    if isinstance(value, float):
+        # amount_m2 из JSON: ближайшее целое к value·100 совпадает с half-up по str(value),
+        # если дробная часть value·100 не у самой половины (иначе — разбор строки)
+        y = value * UNITS_PER_M2
+        if abs(y) < 1e12:
+            r = round(y)
+            if abs(abs(y - r) - 0.5) > 1e-3:
+                return r
+    m = _dec_rx.match(str(value).strip().replace(",", "."))
+    if m is None or not (m.group(2) or m.group(3)):
+        # экспонента ("1e-05" у float), inf/nan и мусор — через Decimal
+        try:
+            d = Decimal(str(value).strip().replace(",", "."))
+        except ArithmeticError:
+            raise ValueError(f"not a number: {value!r}") from None
+        if not d.is_finite():
+            raise ValueError(f"not a number: {value!r}")
+        return int((d * UNITS_PER_M2).to_integral_value(rounding=ROUND_HALF_UP))
+    sign, whole, frac = m.groups()
+    frac = frac or ""
+    n = int(whole or "0") * UNITS_PER_M2 + int(frac[:2].ljust(2, "0"))
+    if frac[2:3] >= "5":
+        n += 1
+    return -n if sign == "-" else n
+
+
+def format_units(units: int) -> str:
+    """Сотые м² -> "12.34" (для полей GUI, таблиц и JSON)."""
+    sign = "-" if units < 0 else ""
+    whole, cents = divmod(abs(units), UNITS_PER_M2)
+    return f"{sign}{whole}.{cents:02d}"
+
+
+def units_to_float(units: int) -> float:
+    """Для полей JSON с float (amount_m2, remain_m3): ближайший float к "12.34"."""
+    return units / UNITS_PER_M2
+
+
+def kerf_um(kerf_mm) -> int:
+    """Толщина пилы (мм, Decimal/str) -> целые мкм."""
+    return int((Decimal(kerf_mm) * KERF_SCALE).to_integral_value(rounding=ROUND_HALF_UP))
@@ -0,0 +1,108 @@
+"""
+Расход материала по Documents/Formulas.md: толщина t, пятно раскроя, м² и отход.
+
+Для детали a×b×c: t = max(d ≤ 52) уходит в толщину плиты, оставшиеся стороны
+p ≥ q — пятно. Штучная позиция (UOM пустой, qty = N шт.): S = p·q·N;
+метражная (UOM = "mm", qty = L_total мм): S = w·L_total, w = q (меньшая из
+оставшихся, большая — длина профиля). Отход по толщине (не возвращается на
+склад): (52 − t)·S·1 мм.
+
+Площадь — целые мм², отход — целые мм³ (без округлений). Пакетный расчёт —
+NumPy за один проход по массивам (numpy — необязательная зависимость,
+pip install kumex[fast]; без неё тот же результат построчно через
+consumption_row, эталонную реализацию).
+"""
+from typing import NamedTuple
+
+try:
+    import numpy as np
+except ImportError:     # без numpy — только построчный расчёт
+    np = None
+
+PLATE_THICKNESS = 52    # мм
+UOM_MM = "mm"
+
+# коды issue (Formulas.md, раздел 5); расход по таким строкам не считается
+OK = 0
+ISSUE_DIMS = 1          # не три положительных размера
+ISSUE_NO_THICKNESS = 2  # нет стороны ≤ 52 — деталь не из плит 52 мм
+ISSUE_QTY = 3           # qty ≤ 0 (пропуск/корректировка — отдельно)
+
+
+class Consumption(NamedTuple):
+    """Расход одной позиции: t, p ≥ q (мм), площадь (мм²), отход (мм³), код issue."""
+    t: int
+    p: int
+    q: int
+    area_mm2: int
+    waste_mm3: int
+    issue: int
+
+
+def consumption_row(a: int, b: int, c: int, qty: int, uom: str = "") -> Consumption:
+    """Эталонный построчный расчёт по Formulas.md."""
+    dims = [a, b, c]
+    if min(dims) <= 0:
+        return Consumption(0, 0, 0, 0, 0, ISSUE_DIMS)
+    fits = [d for d in dims if d <= PLATE_THICKNESS]
+    if not fits:
+        return Consumption(0, 0, 0, 0, 0, ISSUE_NO_THICKNESS)
+    t = max(fits)
+    dims.remove(t)
+    p, q = max(dims), min(dims)
+    if qty <= 0:
+        return Consumption(t, p, q, 0, 0, ISSUE_QTY)
+    if (uom or "").strip().lower() == UOM_MM:
+        area = q * qty          # w · L_total
+    else:
+        area = p * q * qty      # p · q · N
+    return Consumption(t, p, q, area, (PLATE_THICKNESS - t) * area, OK)
+
+
+def _batch_scalar(a, b, c, qty, uom) -> dict:
+    rows = [consumption_row(*r) for r in zip(a, b, c, qty, uom)]
+    return {name: [getattr(r, name) for r in rows] for name in Consumption._fields}
+
+
+def consumption_batch(a, b, c, qty, uom) -> dict:
+    """Расход всех строк сразу: {t, p, q, area_mm2, waste_mm3, issue} — массивы длины n.
+
+    a, b, c, qty — целые (мм / шт. / мм длины), uom — строки ("" или "mm")
+    или уже готовая булева маска «метражная позиция».
+    Без numpy — списки того же содержания (через consumption_row).
+    """
+    if np is None:
+        return _batch_scalar(a, b, c, qty, uom)
+    dims = np.stack([np.asarray(a, dtype=np.int64), np.asarray(b, dtype=np.int64),
+                     np.asarray(c, dtype=np.int64)], axis=1)
+    qty = np.asarray(qty, dtype=np.int64)
+    uom = np.asarray(uom)
+    if uom.dtype == bool:
+        is_mm = uom
+    else:
+        # различных UOM единицы — нормализуются они, а не каждая строка (np.char медленный)
+        names, inv = np.unique(uom.astype(str), return_inverse=True)
+        is_mm = np.array([name.strip().lower() == UOM_MM for name in names], dtype=bool)[inv]
+    n = len(qty)
+
+    # t — наибольшая сторона ≤ 52; её столбец выбрасывается, остаются p ≥ q
+    cand = np.where(dims <= PLATE_THICKNESS, dims, -1)
+    col = cand.argmax(axis=1)
+    t = cand[np.arange(n), col]
+    rest = dims[np.arange(3)[None, :] != col[:, None]].reshape(n, 2)
+    p = rest.max(axis=1)
+    q = rest.min(axis=1)
+
+    issue = np.full(n, OK, dtype=np.int8)
+    issue[qty <= 0] = ISSUE_QTY
+    issue[t < 0] = ISSUE_NO_THICKNESS
+    issue[dims.min(axis=1) <= 0] = ISSUE_DIMS
+    bad_dims = issue == ISSUE_DIMS
+    no_t = issue == ISSUE_NO_THICKNESS
+    for arr in (t, p, q):
+        arr[bad_dims | no_t] = 0
+
+    area = np.where(is_mm, q, p * q) * qty
+    area[issue != OK] = 0
+    waste = (PLATE_THICKNESS - t) * area
+    return {"t": t, "p": p, "q": q, "area_mm2": area, "waste_mm3": waste, "issue": issue}
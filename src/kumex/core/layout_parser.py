@@ -0,0 +1,115 @@
+"""
+Разбор заказа по координатам слов (layout): таблица позиций -> ParsedRow.
+
+Слова группируются в строки по top, колонка количества берётся из строки
+заголовка таблицы ("PartNo ... Ordered Received" в накладных, "Line PartNo
+UOM Qty ..." в заказах). Позиция — строка, у которой в колонке количества
+стоит целое число; описание — первая строка с размерами в блоке этой позиции
+(сама строка и строки под ней до следующей позиции).
+Если заголовок не найден — обычный текстовый разбор (parse_text).
+"""
+import re
+
+from kumex.core.parser import ParsedRow, classify_material, date_rx, parse_text, po_rx, size_rx
+
+# допуск по вертикали для слов одной строки, pt
+LINE_TOL = 3.0
+# допуск по горизонтали для числа под заголовком колонки, pt
+COL_TOL = 6.0
+# заголовки колонки количества по приоритету (накладная: получено, заказ: Qty)
+QTY_HEADERS = ("received", "qty", "quantity", "ordered")
+
+_int_rx = re.compile(r"^\d{1,7}$")
+
+
+def group_lines(words) -> list:
+    """[(page, top, [(x0, x1, text), ...])] — строки сверху вниз, слова слева направо."""
+    lines = []
+    for page, x0, top, x1, _bottom, text in sorted(words, key=lambda w: (w[0], w[2], w[1])):
+        if lines and lines[-1][0] == page and top - lines[-1][1] <= LINE_TOL:
+            lines[-1][2].append((x0, x1, text))
+        else:
+            lines.append((page, top, [(x0, x1, text)]))
+    for _page, _top, ws in lines:
+        ws.sort()
+    return lines
+
+
+def line_text(ws) -> str:
+    return " ".join(w[2] for w in ws)
+
+
+def lines_text(lines) -> str:
+    """Текст документа из строк (для PO/даты, кэша и запасного текстового разбора)."""
+    return "\n".join(line_text(ws) for _page, _top, ws in lines)
+
+
+def _qty_column(ws):
+    """(x0, x1) колонки количества, если строка — заголовок таблицы позиций."""
+    names = {w[2].lower(): w for w in ws}
+    if "partno" not in names:
+        return None
+    for h in QTY_HEADERS:
+        if h in names:
+            return names[h][0], names[h][1]
+    return None
+
+
+def _qty_in_column(ws, col):
+    x0, x1 = col
+    for wx0, wx1, text in ws:
+        # числа в колонке выровнены по правому краю заголовка — достаточно пересечения
+        if wx1 >= x0 - COL_TOL and wx0 <= x1 + COL_TOL and _int_rx.match(text):
+            return int(text)
+    return None
+
+
+def parse_layout(words) -> tuple:
+    """(rows, text): позиции заказа по словам с координатами и текст документа."""
+    lines = group_lines(words)
+    text = lines_text(lines)
+    if not lines:
+        return [], text
+
+    m = po_rx.search(text)
+    po = m.group(1) if m else "?"
+    m = date_rx.search(text)
+    od = m.group(1) if m else "?"
+
+    rows = []
+    col = None          # колонка количества (заголовок повторяется на каждой странице)
+    item = None         # [qty, описание, номер строки] текущей позиции
+
+    def _close():
+        if item is not None and item[1] is not None:
+            desc = item[1]
+            rows.append(ParsedRow(desc=desc, qty=item[0], po=po, date=od,
+                                  material=classify_material(desc), line=item[2]))
+
+    for i, (_page, _top, ws) in enumerate(lines):
+        hdr = _qty_column(ws)
+        if hdr is not None:
+            _close()
+            col, item = hdr, None
+            continue
+        if col is None:
+            continue
+        if ws[0][2].lower() == "total":
+            # итоги — таблица позиций кончилась
+            _close()
+            item = None
+            continue
+        qty = _qty_in_column(ws, col)
+        if qty is not None:
+            _close()
+            item = [qty, None, i]
+        if item is not None and item[1] is None:
+            lt = line_text(ws)
+            if size_rx.search(lt):
+                item[1], item[2] = lt, i
+    _close()
+
+    if col is None:
+        # незнакомая вёрстка — обычный разбор текста
+        return parse_text(text), text
+    return rows, text
@@ -0,0 +1,203 @@
+"""
+Журнал склада (ledger): остатки, закрытие месяца.
+
+Структура состояния — как в kumex_stock.json:
+{"materials": {...}, "ledger": [...], "closed_months": [...],
+ "balances": {...}, "checkpoint": {...}}.
+
+balances — точные текущие остатки (строкой "12.34", см. kumex.core.fixed),
+обновляются по дельте каждой записи; checkpoint — остатки на момент снимка
+и длина ledger тогда, для проверки воспроизведением только «хвоста» журнала.
+Все суммы — целые сотые м² (int), без Decimal и float.
+"""
+import datetime as _dt
+
+from kumex.core.fixed import format_units, parse_units, units_to_float
+from kumex.core.parser import MATERIALS
+
+# знак операции в остатке
+TYPE_SIGN = {"manual_add": 1, "manual_sub": -1, "month_calc": -1}
+
+
+def normalize_stock_data(data) -> dict:
+    """Гарантирует наличие всех ключей структуры склада."""
+    data = data if isinstance(data, dict) else {}
+    data.setdefault("materials", {})
+    for k in MATERIALS:
+        data["materials"].setdefault(k, {})
+        data["materials"][k].setdefault("stock_m3", 0.0)   # тут «м3» — просто имя ключа; фактически м²
+        data["materials"][k].setdefault("remain_m3", 0.0)  # фактически м²
+    data.setdefault("ledger", [])
+    data.setdefault("closed_months", [])
+    return data
+
+
+def keep_stock_materials(data) -> dict:
+    """Оставить в materials только складские материалы (MATERIALS); пусто — оба по умолчанию."""
+    mats = data.get("materials", {})
+    filtered = {k: v for k, v in mats.items() if k in MATERIALS}
+    if filtered != mats:
+        data["materials"] = filtered
+    if not data["materials"]:
+        data["materials"] = {name: {"enabled": True, "stock_m3": 0.0, "remain_m3": 0.0} for name in MATERIALS}
+    return data
+
+
+def _units(value) -> int:
+    try:
+        return parse_units(value if value is not None else 0)
+    except ValueError:
+        return 0
+
+
+def record_delta(rec: dict):
+    """(материал, ±сотые м²) — влияние записи ledger на остаток, или None."""
+    mat = rec.get("material")
+    if mat not in MATERIALS:
+        return None
+    sign = TYPE_SIGN.get((rec.get("type") or "").lower())
+    if sign is None:
+        return None
+    amt = _units(rec.get("amount_m2", 0))
+    return mat, (amt if sign > 0 else -amt)
+
+
+def replay_balances(ledger, start: dict = None) -> dict:
+    """Остатки {материал: сотые м²} после воспроизведения записей поверх start."""
+    sums = {name: _units((start or {}).get(name, 0)) for name in MATERIALS}
+    for rec in ledger:
+        d = record_delta(rec)
+        if d is not None:
+            sums[d[0]] += d[1]
+    return sums
+
+
+def _set_balance(data, mat: str, units: int):
+    data.setdefault("balances", {})[mat] = format_units(units)
+    data["materials"].setdefault(mat, {})["remain_m3"] = units_to_float(units)
+
+
+def _add_delta(data, rec: dict, sign: int = 1):
+    if "balances" not in data:
+        return  # остатки ещё не инициализированы — посчитает current_balances()
+    d = record_delta(rec)
+    if d is None:
+        return
+    mat, delta = d
+    _set_balance(data, mat, _units(data["balances"].get(mat, 0)) + sign * delta)
+
+
+def recompute_balances(data) -> dict:
+    """Полный пересчёт остатков по журналу; пишет remain_m3 в data, возвращает {материал: сотые м²}."""
+    sums = replay_balances(data.get("ledger", []))
+    for mat in MATERIALS:
+        _set_balance(data, mat, sums[mat])
+    return current_balances(data)
+
+
+def current_balances(data) -> dict:
+    """Текущие остатки {материал: сотые м²} без перебора ledger."""
+    if "balances" not in data:
+        return recompute_balances(data)
+    return {mat: _units(data["balances"].get(mat, 0)) for mat in MATERIALS}
+
+
+def set_checkpoint(data):
+    """Запомнить текущие остатки и длину ledger (вызывается при записи снимка)."""
+    current_balances(data)
+    data["checkpoint"] = {
+        "ledger_len": len(data.get("ledger", [])),
+        "balances": dict(data["balances"]),
+    }
+
+
+def verify_balances(data) -> bool:
+    """Сверка: checkpoint + воспроизведение записей после него == текущие остатки."""
+    if "balances" not in data:
+        return False
+    ledger = data.get("ledger", [])
+    cp = data.get("checkpoint") or {}
+    k = cp.get("ledger_len")
+    if isinstance(k, int) and 0 <= k <= len(ledger):
+        expected = replay_balances(ledger[k:], cp.get("balances"))
+    else:
+        expected = replay_balances(ledger)
+    return all(data["balances"].get(mat) == format_units(expected[mat]) for mat in MATERIALS)
+
+
+def is_month_closed(data, month: str) -> bool:
+    return month in set(data.get("closed_months", []))
+
+
+def month_calc_records(month: str, totals: dict, ts=None) -> list:
+    """Записи month_calc за месяц (только ненулевые); totals — {материал: сотые м²}."""
+    ts = ts or _dt.datetime.now().isoformat(timespec="seconds")
+    note = f"Auto: kuu {month} arvestus"
+
+    recs = []
+    for mat in MATERIALS:
+        amount = int(totals.get(mat, 0))
+        if amount > 0:
+            recs.append({
+                "ts": ts,
+                "month": month,
+                "material": mat,
+                "type": "month_calc",
+                "amount_m2": units_to_float(amount),
+                "note": note
+            })
+    return recs
+
+
+# ---------------- события журнала ----------------
+# Любое изменение склада описывается событием; событие применяется к состоянию
+# одинаково и в памяти, и при воспроизведении журнала с диска.
+#   {"op": "append", "rec": {...}}              — новая запись ledger
+#   {"op": "delete_month_calc", "month": "..."} — удалить расчёт месяца и открыть месяц
+#   {"op": "close_month", "month": "..."}       — закрыть месяц
+
+def append_event(rec: dict) -> dict:
+    return {"op": "append", "rec": rec}
+
+
+def close_month_events(month: str, totals: dict, ts=None) -> list:
+    """События фиксации месяца: month_calc-записи + закрытие (пусто, если списывать нечего)."""
+    recs = month_calc_records(month, totals, ts)
+    if not recs:
+        return []
+    return [append_event(r) for r in recs] + [{"op": "close_month", "month": month}]
+
+
+def apply_event(data, ev: dict):
+    """Применяет событие к структуре склада (на месте)."""
+    op = ev.get("op")
+    if op == "append":
+        data.setdefault("ledger", []).append(ev["rec"])
+        _add_delta(data, ev["rec"])
+    elif op == "delete_month_calc":
+        month = ev.get("month")
+        cp = data.get("checkpoint")
+        cp_len = cp.get("ledger_len", 0) if cp else 0
+        kept = []
+        shift = 0
+        for i, r in enumerate(data.get("ledger", [])):
+            if not (r.get("type") == "month_calc" and r.get("month") == month):
+                kept.append(r)
+                continue
+            # вернуть списанное в текущие остатки
+            _add_delta(data, r, sign=-1)
+            # запись была до checkpoint — убрать её и из checkpoint
+            if i < cp_len:
+                shift += 1
+                d = record_delta(r)
+                if d is not None:
+                    cp["balances"][d[0]] = format_units(_units(cp["balances"].get(d[0], 0)) - d[1])
+        data["ledger"] = kept
+        if cp:
+            cp["ledger_len"] = cp_len - shift
+        if month in data.get("closed_months", []):
+            data["closed_months"].remove(month)
+    elif op == "close_month":
+        data.setdefault("closed_months", [])
+        if ev.get("month") not in data["closed_months"]:
+            data["closed_months"].append(ev.get("month"))
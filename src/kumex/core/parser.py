@@ -1,6 +1,156 @@
 """
-Парсер PDF-файлов.
+Парсер PDF-файлов: текст заказа -> строки материалов (без GUI).
 """
-def parse_pdf(file_path):
-    # TODO: реализовать чтение PDF
-    return []
+import re
+from dataclasses import asdict, dataclass
+
+from kumex.io.pdf_reader import read_pdf_text
+
+# материалы, которые учитываются на складе Kumex
+MATERIALS = ("POM Valge", "POM Must")
+
+# способы разбора (ключ "parser_backend" в kumex_config.json):
+# "text" — по склеенному тексту (parse_text), "layout" — по координатам слов (kumex.core.layout_parser)
+PARSER_BACKENDS = ("text", "layout")
+
+# --- паттерны ---
+# размеры: 22x22x1000, 40*67*1000, 20x20 (mm необяз.)
+size_rx = re.compile(r"\b\d+\s*([xX*])\s*\d+(?:\s*\1\s*\d+)?(?:\s*mm\b)?")
+# qty на той же/след. строке: qty=2000, QTY 2000, Quantity: 70
+qty_any_rx = re.compile(r"\b(?:qty|quantity)\s*[:=]?\s*(\d{1,7})\b", re.IGNORECASE)
+# табличный вариант в строке выше: "1 70056 2000 ..." (индекс, partno, qty)
+qty_row_above_rx = re.compile(r"^\s*\d+\s+\S+\s+(\d{1,7})\b")
+# PO и дата (разные варианты написания)
+po_rx = re.compile(r"\bPO(?:\s*(?:Number|No\.?)|)\s*[:#]?\s*([A-Za-z0-9_-]+)")
+date_rx = re.compile(r"\b(?:Order\s*Date|Date)\s*[:#]?\s*([0-9]{1,2}[.\-/][0-9]{1,2}[.\-/][0-9]{2,4})")
+
+
+@dataclass
+class ParsedRow:
+    """Одна позиция заказа."""
+    desc: str
+    qty: int
+    po: str = "?"
+    date: str = "?"
+    material: str = ""   # "" — материал не учитывается (PET, Messing, ESD и т.д.)
+    line: int = -1       # номер строки в тексте PDF (вместе с файлом — ключ строки в таблице)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "ParsedRow":
+        return cls(
+            desc=str(d.get("desc", "")),
+            qty=int(d.get("qty", 0) or 0),
+            po=str(d.get("po", "?")),
+            date=str(d.get("date", "?")),
+            material=str(d.get("material", "")),
+            line=int(d.get("line", -1)),
+        )
+
+
+def classify_material(desc: str) -> str:
+    """Складской материал по описанию позиции ("" — не учитывать)."""
+    d = desc.lower()
+    if "pom" in d and "valge" in d:
+        return "POM Valge"
+    if "pom" in d and ("must" in d or "õhuke" in d):
+        return "POM Must"
+    # всё остальное (PET, Messing, ESD-only и т.д.) не считать
+    return ""
+
+
+def parse_order_month(text: str):
+    """"YYYY-MM" по дате заказа в тексте (день.месяц.год), None — даты нет."""
+    m = date_rx.search(text or "")
+    if not m:
+        return None
+    parts = re.split(r"[.\-/]", m.group(1))
+    try:
+        _day, month, year = (int(x) for x in parts)
+    except ValueError:
+        return None
+    if year < 100:
+        year += 2000
+    if not 1 <= month <= 12:
+        return None
+    return f"{year}-{month:02d}"
+
+
+def _qty_above(*lines):
+    """Табличный вариант: qty в строке выше ("1 70056 2000 ..."), ближайшая строка первой."""
+    for ln in lines:
+        m = qty_row_above_rx.match(ln)
+        if m:
+            return int(m.group(1))
+    return None
+
+
+def parse_text(text: str) -> list:
+    """Разбирает текст одного PDF в список ParsedRow.
+
+    Один проход по строкам: строка с размерами берёт qty из своей строки,
+    иначе из первой строки с qty на 1..3 ниже (ждёт их в pending),
+    иначе из табличной строки на 1..2 выше. Каждая строка проверяется
+    каждым шаблоном не более одного раза.
+    """
+    if not text:
+        return []
+
+    m = po_rx.search(text)
+    po = m.group(1) if m else "?"
+    m = date_rx.search(text)
+    od = m.group(1) if m else "?"
+
+    def _row(desc, qty, i):
+        return ParsedRow(desc=desc, qty=qty, po=po, date=od, material=classify_material(desc), line=i)
+
+    rows = []       # ParsedRow или None (позиция ещё ждёт qty / так и не нашла)
+    pending = []    # [индекс в rows, номер строки, описание, строка выше, через одну выше]
+    prev1 = prev2 = ""
+    for i, raw in enumerate(text.splitlines()):
+        line = raw.strip()
+        # ищем строку-описание по наличию размеров; без "x"/"*" size_rx не совпадёт —
+        # дешёвая проверка подстроки отсекает большинство строк до регулярки
+        is_size = ("x" in line or "*" in line or "X" in line) and size_rx.search(line) is not None
+        q = None
+        if is_size or pending:
+            m = qty_any_rx.search(line)
+            if m:
+                q = int(m.group(1))
+
+        if pending:
+            keep = []
+            for p in pending:
+                if q is not None:
+                    rows[p[0]] = _row(p[2], q, p[1])
+                elif i - p[1] >= 3:
+                    # три строки ниже просмотрены — табличный вариант выше
+                    qa = _qty_above(p[3], p[4])
+                    if qa is not None:
+                        rows[p[0]] = _row(p[2], qa, p[1])
+                else:
+                    keep.append(p)
+            pending = keep
+
+        if is_size:
+            if q is not None:
+                rows.append(_row(line, q, i))
+            else:
+                pending.append((len(rows), i, line, prev1, prev2))
+                rows.append(None)
+        prev2, prev1 = prev1, line
+
+    # текст кончился раньше, чем 3 строки ниже
+    for p in pending:
+        qa = _qty_above(p[3], p[4])
+        if qa is not None:
+            rows[p[0]] = _row(p[2], qa, p[1])
+    # не смогли уверенно найти количество — позицию пропускаем
+    return [r for r in rows if r is not None]
+
+
+def parse_pdf(file_path, profile=None) -> list:
+    """Читает PDF и возвращает найденные позиции (list[ParsedRow])."""
+    return parse_text(read_pdf_text(str(file_path), profile))
@@ -1,6 +1,42 @@
 """
 Генерация отчётов (JSON/CSV).
 """
-def generate_report(aggregates, month, output_dir):
-    # TODO: реализовать запись отчётов
-    return None
+import csv
+from pathlib import Path
+
+from kumex.core.fixed import format_units
+from kumex.io.file_ops import save_json
+
+
+def generate_report(aggregates, month, output_dir, rows=None):
+    """Пишет итоги месяца (kumex_<месяц>.json/.csv) и, если даны, строки заказов.
+
+    aggregates — {материал: сотые м²}; rows — ParsedRow. Возвращает пути созданных файлов.
+    """
+    out = Path(output_dir)
+    out.mkdir(parents=True, exist_ok=True)
+    totals = {name: format_units(value) for name, value in aggregates.items()}
+
+    json_path = out / f"kumex_{month}.json"
+    data = {"month": month, "totals_m2": totals}
+    if rows is not None:
+        data["rows"] = [r.to_dict() for r in rows]
+    save_json(json_path, data)
+
+    csv_path = out / f"kumex_{month}.csv"
+    with open(csv_path, "w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["month", "material", "m2"])
+        for name, value in totals.items():
+            w.writerow([month, name, value])
+    paths = [json_path, csv_path]
+
+    if rows is not None:
+        rows_path = out / f"kumex_{month}_rows.csv"
+        with open(rows_path, "w", encoding="utf-8", newline="") as f:
+            w = csv.writer(f)
+            w.writerow(["desc", "qty", "po", "date", "material"])
+            for r in rows:
+                w.writerow([r.desc, r.qty, r.po, r.date, r.material])
+        paths.append(rows_path)
+    return paths
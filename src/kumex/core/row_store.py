@@ -0,0 +1,91 @@
+"""
+Колоночное хранилище строк заказов: размеры, qty, материал и PO разобраны один раз.
+
+Строки ParsedRow при добавлении раскладываются по типизированным массивам
+(array): стороны A/B, qty, номер материала, номер PO. Пересчёт площадей и
+сводки идут по этим массивам, без повторного разбора описаний регулярками.
+Текстовые поля (desc, дата) хранятся для таблицы и отчёта.
+
+Площадь с пилой k: Σ(A+k)(B+k)·q = ΣAB·q + k·Σ(A+B)·q + k²·Σq. Три целые
+суммы по каждому материалу копятся при добавлении строк, поэтому смена
+толщины пилы пересчитывается за O(1), без прохода по строкам. Арифметика
+целочисленная (kumex.core.fixed): мм, пила в мкм, итог — сотые м².
+"""
+from array import array
+from decimal import Decimal
+
+from kumex.core.aggregator import plate_sides
+from kumex.core.fixed import KERF_SCALE, UM2_PER_UNIT, div_round, kerf_um
+from kumex.core.parser import MATERIALS, ParsedRow
+
+# номер материала в колонке mat: индекс в MATERIALS, NO_MATERIAL — не учитывается
+NO_MATERIAL = -1
+# сторона A, если размеры в описании не распознаны
+NO_SIDES = -1
+_MAT_ID = {name: i for i, name in enumerate(MATERIALS)}
+
+
+class RowStore:
+    """Строки заказов по колонкам; итерация отдаёт ParsedRow (для таблицы и отчётов)."""
+
+    __slots__ = ("a", "b", "qty", "mat", "po_id", "line", "desc", "date", "pos", "_po_ids", "_sums")
+
+    def __init__(self, rows=()):
+        self.a = array("q")         # сторона A, мм (NO_SIDES — размеры не распознаны)
+        self.b = array("q")         # сторона B, мм
+        self.qty = array("q")
+        self.mat = array("b")       # индекс в MATERIALS или NO_MATERIAL
+        self.po_id = array("q")     # индекс в pos
+        self.line = array("q")
+        self.desc = []
+        self.date = []
+        self.pos = []               # различные номера PO
+        self._po_ids = {}
+        # по материалам: [ΣAB·q, Σ(A+B)·q, Σq] (мм², мм, шт.)
+        self._sums = [[0, 0, 0] for _ in MATERIALS]
+        self.extend(rows)
+
+    def __len__(self) -> int:
+        return len(self.qty)
+
+    def append(self, row: ParsedRow):
+        sides = plate_sides(row.desc)
+        a, b = sides if sides is not None else (NO_SIDES, 0)
+        pid = self._po_ids.get(row.po)
+        if pid is None:
+            pid = self._po_ids[row.po] = len(self.pos)
+            self.pos.append(row.po)
+        m = _MAT_ID.get(row.material, NO_MATERIAL)
+        if m != NO_MATERIAL and sides is not None:
+            s = self._sums[m]
+            s[0] += a * b * row.qty
+            s[1] += (a + b) * row.qty
+            s[2] += row.qty
+        self.a.append(a)
+        self.b.append(b)
+        self.qty.append(row.qty)
+        self.mat.append(m)
+        self.po_id.append(pid)
+        self.line.append(row.line)
+        self.desc.append(row.desc)
+        self.date.append(row.date)
+
+    def extend(self, rows):
+        for row in rows:
+            self.append(row)
+
+    def row(self, i: int) -> ParsedRow:
+        m = self.mat[i]
+        return ParsedRow(desc=self.desc[i], qty=self.qty[i], po=self.pos[self.po_id[i]], date=self.date[i],
+                         material=MATERIALS[m] if m != NO_MATERIAL else "", line=self.line[i])
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.row(i)
+
+    def totals(self, kerf_mm=Decimal("0")) -> dict:
+        """Площадь Σ(A+k)(B+k)·q по материалам в сотых м² (пила с точностью до мкм, одно округление half-up)."""
+        k = kerf_um(kerf_mm)
+        s = KERF_SCALE
+        return {name: div_round(ab_q * s * s + k * apb_q * s + k * k * q, UM2_PER_UNIT)
+                for name, (ab_q, apb_q, q) in zip(MATERIALS, self._sums)}
@@ -2,6 +2,8 @@
 Работа с конфигами и JSON-состоянием.
 """
 import json
+import os
+import tempfile
 from pathlib import Path
 
 def load_json(path, default=None):
@@ -11,7 +13,45 @@ def load_json(path, default=None):
     except FileNotFoundError:
         return default if default is not None else {}
 
+def load_json_lenient(path, default=None):
+    """Как load_json, но для восстановимых файлов (кэши, индекс, сеанс):
+    нечитаемый или повреждённый файл считается отсутствующим."""
+    try:
+        data = load_json(path, default)
+    except (OSError, ValueError):
+        # ValueError — в т.ч. JSONDecodeError и UnicodeDecodeError
+        data = None
+    if not isinstance(data, dict):
+        return default if default is not None else {}
+    return data
+
 def save_json(path, data):
     Path(path).parent.mkdir(parents=True, exist_ok=True)
     with open(path, "w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
+
+def default_state_dir() -> Path:
+    """Папка состояния Kumex: %APPDATA%\\Kumex (или ~/AppData/Roaming/Kumex)."""
+    appdata = Path(os.getenv("APPDATA") or Path.home() / "AppData" / "Roaming")
+    return appdata / "Kumex"
+
+def save_json_atomic(path, data):
+    """Как save_json, но через временный файл + os.replace: при сбое старый файл цел.
+
+    Временный файл у каждого писателя свой — GUI и CLI могут сохранять одновременно.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(prefix=path.name + ".", suffix=".tmp", dir=path.parent)
+    try:
+        with open(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, ensure_ascii=False, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, path)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
@@ -0,0 +1,109 @@
+"""
+Хранилище склада: снимок kumex_stock.json + журнал событий kumex_ledger.jsonl.
+
+Операция склада — одна дозапись строки в журнал (O(1) по объёму ledger).
+Снимок переписывается только при уплотнении (каждые compact_every событий).
+Остатки при воспроизведении журнала меняются по дельтам (см. kumex.core.ledger).
+Снимок хранит номер поколения журнала (journal_gen): события старого
+поколения после сбоя между записью снимка и очисткой журнала игнорируются.
+"""
+import json
+import os
+from pathlib import Path
+
+from kumex.core.ledger import apply_event, normalize_stock_data, recompute_balances, set_checkpoint
+from kumex.io.file_ops import load_json, save_json_atomic
+from kumex.io.sqlite_store import migrate_json_to_sqlite
+
+# допустимые значения ключа "storage" в kumex_config.json
+BACKENDS = ("json", "sqlite")
+
+
+class LedgerStore:
+    def __init__(self, stock_path, journal_path=None, compact_every: int = 1000):
+        self.stock_path = Path(stock_path)
+        self.journal_path = Path(journal_path) if journal_path else \
+            self.stock_path.with_name("kumex_ledger.jsonl")
+        self.compact_every = compact_every
+        self.pending = 0      # событий в журнале после последнего снимка
+        self.rebuilt_balances = False   # load() пересчитал остатки, которых нет на диске
+
+    def _read_journal(self, gen: int) -> list:
+        events = []
+        try:
+            with open(self.journal_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        ev = json.loads(line)
+                    except ValueError:
+                        # недописанная строка (сбой при записи) — пропускаем
+                        continue
+                    if ev.get("gen", 0) == gen:
+                        events.append(ev)
+        except FileNotFoundError:
+            pass
+        return events
+
+    def load(self) -> dict:
+        """Снимок + воспроизведение журнала -> структура склада как в kumex_stock.json."""
+        data = normalize_stock_data(load_json(self.stock_path, default={}))
+        # старый файл без точных остатков — один полный пересчёт, дальше по дельтам
+        self.rebuilt_balances = "balances" not in data
+        if self.rebuilt_balances:
+            recompute_balances(data)
+        events = self._read_journal(int(data.get("journal_gen", 0)))
+        for ev in events:
+            apply_event(data, ev)
+        self.pending = len(events)
+        return data
+
+    def commit(self, data, events: list):
+        """Дописывает события в журнал и применяет их к data."""
+        if not events:
+            return
+        gen = int(data.get("journal_gen", 0))
+        self.journal_path.parent.mkdir(parents=True, exist_ok=True)
+        lines = "".join(json.dumps(dict(ev, gen=gen), ensure_ascii=False) + "\n" for ev in events)
+        with open(self.journal_path, "ab+") as f:
+            # после сбоя последняя строка может быть недописана — начинаем с новой строки
+            if f.seek(0, os.SEEK_END) > 0:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    lines = "\n" + lines
+            f.write(lines.encode("utf-8"))
+            f.flush()
+            os.fsync(f.fileno())
+        for ev in events:
+            apply_event(data, ev)
+        self.pending += len(events)
+        if self.pending >= self.compact_every:
+            self.save_snapshot(data)
+
+    def save_snapshot(self, data):
+        """Полный снимок состояния; журнал начинается заново (новое поколение)."""
+        data["journal_gen"] = int(data.get("journal_gen", 0)) + 1
+        set_checkpoint(data)
+        save_json_atomic(self.stock_path, data)
+        # снимок уже учитывает все события — старый журнал больше не нужен
+        with open(self.journal_path, "w", encoding="utf-8"):
+            pass
+        self.pending = 0
+
+    def watched_paths(self) -> tuple:
+        """Файлы, изменение которых извне означает, что состояние надо перечитать."""
+        return self.stock_path, self.journal_path
+
+
+def open_store(state_dir, backend: str = "json"):
+    """Хранилище склада в папке состояния: JSON (+журнал) или SQLite.
+
+    При первом открытии SQLite данные переносятся из kumex_stock.json.
+    """
+    state_dir = Path(state_dir)
+    json_store = LedgerStore(state_dir / "kumex_stock.json")
+    if backend == "sqlite":
+        return migrate_json_to_sqlite(json_store, state_dir / "kumex_stock.sqlite3")
+    return json_store
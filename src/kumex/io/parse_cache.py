@@ -0,0 +1,162 @@
+"""
+Постоянный кэш разбора PDF (найденные строки и месяц заказа).
+
+Ключ записи — путь к файлу, проверка свежести — размер и mtime
+(опционально ещё и SHA-256 содержимого). Извлечённый текст не хранится:
+файл переписывается целиком при каждом сохранении. Записи исчезнувших
+файлов убирает prune_folder(), общий размер ограничен MAX_ENTRIES.
+"""
+import hashlib
+import os
+import threading
+from pathlib import Path
+
+from kumex.io.file_ops import load_json_lenient, save_json_atomic
+
+# при изменении формата записей/правил парсинга — увеличить, старый кэш будет отброшен
+CACHE_VERSION = 5
+
+# больше записей не храним: при сохранении отбрасываются самые старые PDF (по mtime)
+MAX_ENTRIES = 20_000
+
+
+def file_sha256(path, chunk_size: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def cache_variant(profile_name: str, backend: str = "text") -> str:
+    """Вариант записей: профиль извлечения (+ способ разбора, если не текстовый)."""
+    return profile_name if backend == "text" else f"{profile_name}+{backend}"
+
+
+class ParseCache:
+    """Кэш в JSON-файле: {путь: {path, size, mtime_ns, sha256, variant, order_month, text, rows}}.
+
+    order_month — "YYYY-MM" по дате заказа из текста (None — даты нет);
+    по нему ведётся индекс месяц -> документы (month_entries).
+    """
+
+    def __init__(self, path, verify_hash: bool = False, variant: str = ""):
+        self.path = Path(path)
+        self.verify_hash = verify_hash
+        # способ извлечения (профиль PDF и т.п.): записи другого варианта считаются устаревшими
+        self.variant = variant
+        self._dirty = False
+        # кэш пишется из фонового потока разбора, а сохраняется из GUI
+        self._lock = threading.Lock()
+        # повреждённый кэш (сбой при записи) — как пустой: всё разберётся заново
+        data = load_json_lenient(self.path, default={})
+        if data.get("version") == CACHE_VERSION:
+            self._entries = data.get("entries", {}) or {}
+        else:
+            self._entries = {}
+        for entry in self._entries.values():
+            # прежние версии хранили и весь текст PDF — он не нужен
+            if entry.pop("text", None) is not None:
+                self._dirty = True
+        self._by_month = None     # месяц заказа -> {ключ}; строится при первом запросе
+
+    @staticmethod
+    def _key(file_path) -> str:
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def get(self, file_path, st=None):
+        """Вернуть запись {text, rows, ...}, если файл не менялся, иначе None."""
+        with self._lock:
+            entry = self._entries.get(self._key(file_path))
+        if entry is None:
+            return None
+        try:
+            st = st or os.stat(file_path)
+        except OSError:
+            return None
+        if entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns:
+            return None
+        if entry.get("variant", "") != self.variant:
+            return None
+        if self.verify_hash:
+            try:
+                if entry.get("sha256") != file_sha256(file_path):
+                    return None
+            except OSError:
+                return None
+        return entry
+
+    def put(self, file_path, rows: list, st=None, order_month=None):
+        try:
+            st = st or os.stat(file_path)
+            digest = file_sha256(file_path) if self.verify_hash else None
+        except OSError:
+            return
+        key = self._key(file_path)
+        with self._lock:
+            old = self._entries.get(key)
+            if self._by_month is not None:
+                if old is not None and old.get("order_month"):
+                    self._by_month.get(old["order_month"], set()).discard(key)
+                if order_month:
+                    self._by_month.setdefault(order_month, set()).add(key)
+            self._entries[key] = {
+                "path": str(file_path),
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "sha256": digest,
+                "variant": self.variant,
+                "order_month": order_month,
+                "rows": rows,
+            }
+            self._dirty = True
+
+    def month_entries(self, month: str) -> list:
+        """[(путь, запись)] документов с датой заказа в месяце month (свежесть не проверяется)."""
+        with self._lock:
+            if self._by_month is None:
+                self._by_month = {}
+                for key, e in self._entries.items():
+                    if e.get("order_month"):
+                        self._by_month.setdefault(e["order_month"], set()).add(key)
+            return [(self._entries[k]["path"], self._entries[k]) for k in self._by_month.get(month, ())]
+
+    def peek(self, file_path, st):
+        """Запись для файла с данными size/mtime без обращения к диску, иначе None."""
+        with self._lock:
+            entry = self._entries.get(self._key(file_path))
+        if entry is None or entry.get("variant", "") != self.variant:
+            return None
+        if entry.get("size") != st.st_size or entry.get("mtime_ns") != st.st_mtime_ns:
+            return None
+        return entry
+
+    def prune_folder(self, folder, names) -> int:
+        """Убрать записи файлов папки, которых в ней больше нет (names — имена файлов папки)."""
+        folder_key = self._key(folder)
+        alive = {os.path.normcase(n) for n in names}
+        with self._lock:
+            gone = [k for k in self._entries
+                    if os.path.dirname(k) == folder_key and os.path.basename(k) not in alive]
+            for k in gone:
+                del self._entries[k]
+            if gone:
+                self._by_month = None
+                self._dirty = True
+        return len(gone)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def save(self):
+        """Записать кэш на диск (только если были изменения)."""
+        with self._lock:
+            if not self._dirty:
+                return
+            if len(self._entries) > MAX_ENTRIES:
+                by_age = sorted(self._entries, key=lambda k: self._entries[k].get("mtime_ns") or 0)
+                for k in by_age[:len(self._entries) - MAX_ENTRIES]:
+                    del self._entries[k]
+                self._by_month = None
+            save_json_atomic(self.path, {"version": CACHE_VERSION, "entries": self._entries})
+            self._dirty = False
@@ -0,0 +1,197 @@
+"""
+Постоянный индекс папок с PDF: файлы по месяцам без обхода папки при каждом выборе месяца.
+
+Для папки хранится mtime самой папки и {имя: [size, mtime_ns]} файлов.
+Первая сверка папки в сеансе — всегда полный scandir со сравнением размера
+и mtime каждого файла (PDF могли перезаписать на месте, пока программа не
+работала). Дальше на каждый запрос — один stat папки: перечитывается она,
+только если изменился её mtime (файлы добавляли, удаляли, переименовывали);
+иначе ответ берётся из индекса (важно для сетевой папки).
+"""
+import bisect
+import fnmatch
+import os
+import threading
+import time
+from pathlib import Path
+from typing import NamedTuple
+
+from kumex.io.file_ops import load_json_lenient, save_json_atomic
+from kumex.io.pdf_scan import month_bounds
+
+INDEX_VERSION = 1
+
+# режимы отнесения PDF к месяцу (ключ "month_by" в kumex_config.json)
+MONTH_MODES = ("mtime", "order_date")
+
+# заказ датируется не позже, чем файл появился в папке; запас — на PDF,
+# выписанные заранее (дата заказа в следующем месяце)
+ORDER_DATE_SLACK_DAYS = 7
+
+
+class FileStat(NamedTuple):
+    """Размер и mtime из индекса (подходит вместо os.stat_result для ParseCache)."""
+    st_size: int
+    st_mtime_ns: int
+
+
+def month_of(mtime_ns: int) -> str:
+    """"YYYY-MM" по времени изменения (локальное время, как month_bounds)."""
+    return time.strftime("%Y-%m", time.localtime(mtime_ns / 1e9))
+
+
+class PdfIndex:
+    """Индекс в JSON-файле: {папка: {dir_mtime_ns, files: {имя: [size, mtime_ns]}}}."""
+
+    def __init__(self, path=None, pattern: str = "*.pdf"):
+        self.path = Path(path) if path else None
+        self.pattern = pattern
+        self._dirty = False
+        self._lock = threading.Lock()
+        self._checked = set()     # папки, сверенные с диском в этом сеансе
+        self._buckets = {}        # папка -> {месяц: [имена]}
+        self._by_mtime = {}       # папка -> [(mtime_ns, имя)] по возрастанию
+        # повреждённый индекс — как пустой: папки просто перечитаются
+        data = load_json_lenient(self.path, default={}) if self.path else {}
+        if data.get("version") == INDEX_VERSION:
+            self._folders = data.get("folders", {}) or {}
+        else:
+            self._folders = {}
+
+    @staticmethod
+    def _key(folder) -> str:
+        return os.path.normcase(os.path.abspath(folder))
+
+    def refresh(self, folder, full: bool = False) -> bool:
+        """Сверить папку с диском; True, если файлы (список, размер, mtime) изменились.
+
+        full=True или первая сверка папки в сеансе — scandir всегда;
+        иначе — только если изменился mtime папки.
+        """
+        key = self._key(folder)
+        try:
+            dir_mtime = os.stat(folder).st_mtime_ns
+        except OSError:
+            return False
+        with self._lock:
+            first = key not in self._checked
+            self._checked.add(key)
+            entry = self._folders.get(key)
+            if not (full or first) and entry is not None and entry.get("dir_mtime_ns") == dir_mtime:
+                return False
+            old = entry.get("files", {}) if entry else {}
+
+        files = {}
+        with os.scandir(folder) as it:
+            for de in it:
+                if not fnmatch.fnmatch(de.name, self.pattern):
+                    continue
+                try:
+                    # на Windows stat() у DirEntry уже получен вместе со списком
+                    st = de.stat()
+                except OSError:
+                    continue
+                if not de.is_file():
+                    continue
+                files[de.name] = [st.st_size, st.st_mtime_ns]
+
+        with self._lock:
+            changed = files != old
+            if changed or entry is None or entry.get("dir_mtime_ns") != dir_mtime:
+                self._folders[key] = {"dir_mtime_ns": dir_mtime, "files": files}
+                self._buckets.pop(key, None)
+                self._by_mtime.pop(key, None)
+                self._dirty = True
+        return changed
+
+    def _month_buckets(self, key) -> dict:
+        buckets = self._buckets.get(key)
+        if buckets is None:
+            buckets = {}
+            for name, (_size, mtime_ns) in self._folders.get(key, {}).get("files", {}).items():
+                buckets.setdefault(month_of(mtime_ns), []).append(name)
+            for names in buckets.values():
+                names.sort(key=lambda n: (n.lower(), n))
+            self._buckets[key] = buckets
+        return buckets
+
+    def month_files(self, folder, yy: int, mm: int) -> list:
+        """PDF папки за месяц по индексу (перед ответом — refresh(): один stat папки)."""
+        key = self._key(folder)
+        self.refresh(folder)
+        with self._lock:
+            names = self._month_buckets(key).get(f"{yy}-{mm:02d}", [])
+        return [Path(folder) / n for n in names]
+
+    def _newer_than(self, key, mtime_ns) -> list:
+        order = self._by_mtime.get(key)
+        if order is None:
+            files = self._folders.get(key, {}).get("files", {})
+            order = sorted((v[1], name) for name, v in files.items())
+            self._by_mtime[key] = order
+        return [name for _m, name in order[bisect.bisect_left(order, (mtime_ns, "")):]]
+
+    def doc_month(self, file_path, cache):
+        """Месяц документа по дате заказа из кэша; без даты — по mtime; None — ещё не разобран."""
+        st = self.stat(file_path)
+        if st is None:
+            return None
+        entry = cache.peek(file_path, st)
+        if entry is None:
+            return None
+        return entry.get("order_month") or month_of(st.st_mtime_ns)
+
+    def order_date_files(self, folder, yy: int, mm: int, cache) -> list:
+        """PDF месяца по дате заказа (индекс месяц -> документы в кэше разбора).
+
+        Плюс ещё не разобранные файлы, изменённые не раньше начала месяца
+        (минус ORDER_DATE_SLACK_DAYS): их дата станет известна после разбора,
+        лишние отсекаются по doc_month().
+        """
+        key = self._key(folder)
+        self.refresh(folder)
+        month = f"{yy}-{mm:02d}"
+        files = self.files(folder)
+        names = set()
+        for path, entry in cache.month_entries(month):
+            p = Path(path)
+            if self._key(p.parent) == key and files.get(p.name) == (entry.get("size"), entry.get("mtime_ns")):
+                names.add(p.name)
+        start_ns = int((month_bounds(yy, mm)[0] - ORDER_DATE_SLACK_DAYS * 86400) * 1e9)
+        with self._lock:
+            newer = self._newer_than(key, start_ns)
+        for name in newer:
+            if name in names:
+                continue
+            st = FileStat(*files[name])
+            entry = cache.peek(Path(folder) / name, st)
+            if entry is None:
+                names.add(name)           # дата неизвестна — разобрать
+            elif not entry.get("order_month") and month_of(st.st_mtime_ns) == month:
+                names.add(name)           # в PDF нет даты — по mtime
+        return [Path(folder) / n for n in sorted(names, key=lambda n: (n.lower(), n))]
+
+    def checked(self, folder) -> bool:
+        """Папка уже сверялась с диском в этом сеансе (и тогда существовала)."""
+        return self._key(folder) in self._checked
+
+    def files(self, folder) -> dict:
+        """Копия {имя: (size, mtime_ns)} папки из индекса."""
+        with self._lock:
+            files = self._folders.get(self._key(folder), {}).get("files", {})
+            return {name: tuple(v) for name, v in files.items()}
+
+    def stat(self, file_path):
+        """FileStat файла из индекса или None (тогда проверять по диску)."""
+        p = Path(file_path)
+        with self._lock:
+            rec = self._folders.get(self._key(p.parent), {}).get("files", {}).get(p.name)
+        return FileStat(*rec) if rec else None
+
+    def save(self):
+        if not self._dirty or self.path is None:
+            return
+        with self._lock:
+            data = {"version": INDEX_VERSION, "folders": self._folders}
+            save_json_atomic(self.path, data)
+            self._dirty = False
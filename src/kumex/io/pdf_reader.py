@@ -1,15 +1,148 @@
 """
 Простое чтение текста из PDF (все страницы склеены).
+
+pdfplumber (с pdfminer, PIL, charset_normalizer) и пул процессов импортируются
+при первом чтении PDF, а не при импорте модуля: окно GUI появляется, не дожидаясь
+их загрузки (~0.1 с и больше в one-file сборке). warm_up() загружает их заранее
+в фоне.
 """
+import importlib
+import os
+import re
+from functools import partial
 from pathlib import Path
-import pdfplumber
+from typing import NamedTuple, Optional
+
+# меньше файлов — дешевле прочитать в текущем процессе, чем поднимать пул
+MIN_FILES_FOR_POOL = 4
+
+
+class PdfProfile(NamedTuple):
+    """Что извлекать из PDF: сколько страниц и когда остановиться."""
+    max_pages: Optional[int] = None
+    # читать следующую страницу, только если внизу есть "Continued on Page#"
+    stop_after_table: bool = False
+
+
+FULL_PROFILE = PdfProfile()
+# Заказы/накладные Dafine (см. Kättesaamine/pdf_words_dump.txt): на многостраничных
+# заказах внизу страницы "Continued on Page# N". Число страниц не ограничено:
+# чтение останавливается по концу таблицы, длинный заказ не обрезается молча.
+# Области страницы не вырезаются: crop делается уже после вёрстки всей страницы
+# pdfminer'ом и ничего не экономит (на Kättesaamine/ — даже на ~8% медленнее).
+ORDER_PROFILE = PdfProfile(stop_after_table=True)
+
+PROFILES = {"full": FULL_PROFILE, "order": ORDER_PROFILE}
+
+# в сырых символах пробелов нет: "ContinuedonPage#2"
+_continued_rx = re.compile(r"Continued\s*on\s*Page", re.IGNORECASE)
+
+
+def _pdfplumber():
+    import pdfplumber  # тяжёлый импорт — только когда нужен (см. docstring модуля)
+    return pdfplumber
+
+
+def warm_up():
+    """Загрузить зависимости чтения PDF заранее (фоновый поток после показа окна)."""
+    _pdfplumber()
+    importlib.import_module("concurrent.futures.process")   # пул процессов разбора
+
+
+def _has_continuation(page_text: str) -> bool:
+    return bool(_continued_rx.search(page_text))
+
 
-def read_pdf_text(file_path: str) -> str:
+def read_pdf_text(file_path: str, profile: Optional[PdfProfile] = None) -> str:
     p = Path(file_path)
     if not p.exists():
         return ""
+    profile = profile or FULL_PROFILE
     chunks = []
-    with pdfplumber.open(p) as pdf:
-        for page in pdf.pages:
-            chunks.append(page.extract_text() or "")
+    with _pdfplumber().open(p) as pdf:
+        pages = pdf.pages[:profile.max_pages] if profile.max_pages else pdf.pages
+        for page in pages:
+            text = page.extract_text() or ""
+            chunks.append(text)
+            if profile.stop_after_table and not _has_continuation(text):
+                break
     return "\n".join(chunks)
+
+
+def read_pdf_layout(file_path: str, profile: Optional[PdfProfile] = None) -> list:
+    """Слова страниц (как read_pdf_text по профилю) с координатами:
+    [(page, x0, top, x1, bottom, text)] — для разбора по вёрстке (kumex.core.layout_parser)."""
+    p = Path(file_path)
+    if not p.exists():
+        return []
+    profile = profile or FULL_PROFILE
+    out = []
+    with _pdfplumber().open(p) as pdf:
+        pages = pdf.pages[:profile.max_pages] if profile.max_pages else pdf.pages
+        for pageno, page in enumerate(pages, start=1):
+            words = page.extract_words(keep_blank_chars=False)
+            out.extend((pageno, w["x0"], w["top"], w["x1"], w["bottom"], w["text"]) for w in words)
+            if profile.stop_after_table and not _has_continuation(" ".join(w["text"] for w in words)):
+                break
+    return out
+
+
+def read_pdf_words(file_path: str, extra_attrs=None) -> list:
+    """Слова с координатами: [(page, x0, top, x1, bottom, text)], сверху-вниз, слева-направо."""
+    out = []
+    with _pdfplumber().open(Path(file_path)) as pdf:
+        for pageno, page in enumerate(pdf.pages, start=1):
+            words = page.extract_words(
+                use_text_flow=True,
+                keep_blank_chars=False,
+                extra_attrs=extra_attrs,
+            )
+            words.sort(key=lambda w: (w["top"], w["x0"]))
+            for w in words:
+                out.append((pageno, w["x0"], w["top"], w["x1"], w["bottom"], w.get("text") or ""))
+    return out
+
+
+def _call_safe(func, path):
+    # исключение отдаём строкой: не каждое исключение pdfminer переживает pickle
+    try:
+        return path, func(path), None
+    except Exception as e:
+        return path, None, f"{type(e).__name__}: {e}"
+
+
+def iter_pdf_batch(func, paths, workers=None, ordered: bool = True):
+    """Применяет func(path) к каждому PDF в пуле процессов.
+
+    Отдаёт кортежи (path, result, error); ошибка одного файла не прерывает пакет.
+    ordered=True — в порядке paths, иначе по мере готовности.
+    workers=None — по числу ядер, workers=1 — без пула.
+    """
+    paths = [str(p) for p in paths]
+    workers = workers or os.cpu_count() or 1
+    if workers <= 1 or len(paths) < MIN_FILES_FOR_POOL:
+        for p in paths:
+            yield _call_safe(func, p)
+        return
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    ex = ProcessPoolExecutor(max_workers=min(workers, len(paths)))
+    try:
+        futures = {ex.submit(_call_safe, func, p): p for p in paths}
+        for fut in (futures if ordered else as_completed(futures)):
+            try:
+                yield fut.result()
+            except Exception as e:
+                # упал сам процесс-исполнитель (BrokenProcessPool и т.п.)
+                yield futures[fut], None, f"{type(e).__name__}: {e}"
+    finally:
+        # при досрочном выходе (отмена) не ждём оставшиеся файлы
+        ex.shutdown(wait=False, cancel_futures=True)
+
+
+def read_pdf_texts(paths, workers=None, ordered: bool = True, profile: Optional[PdfProfile] = None,
+                   reader=read_pdf_text):
+    """Пакетный read_pdf_text (или другой reader(path, profile)): (path, результат, error) для каждого файла."""
+    func = partial(reader, profile=profile) if profile else reader
+    return iter_pdf_batch(func, paths, workers=workers, ordered=ordered)
@@ -0,0 +1,16 @@
+"""
+Границы месяца для отнесения PDF заказов по времени изменения файла
+(сами списки файлов — kumex.io.pdf_index).
+"""
+import time
+
+
+def month_bounds(yy: int, mm: int):
+    """Границы месяца [start, end) как timestamp (локальное время)."""
+    start_ts = time.mktime((yy, mm, 1, 0, 0, 0, 0, 0, -1))
+    if mm == 12:
+        end_ts = time.mktime((yy + 1, 1, 1, 0, 0, 0, 0, 0, -1))
+    else:
+        end_ts = time.mktime((yy, mm + 1, 1, 0, 0, 0, 0, 0, -1))
+    return start_ts, end_ts
+
@@ -0,0 +1,74 @@
+"""
+Наблюдение за папкой PDF опросом (без inotify и внешних служб — папка обычно сетевая).
+
+Раз в interval секунд поток сверяет папку через PdfIndex полным scandir
+(размер и mtime каждого файла): перезапись PDF на месте mtime папки не
+меняет, поэтому одного stat папки мало. Новые/изменённые файлы сначала
+«дозревают»: о них сообщается, когда размер и mtime не менялись между двумя
+опросами (файл докопирован). В простое — один scandir за интервал.
+"""
+import queue
+import threading
+from pathlib import Path
+
+
+class FolderWatcher(threading.Thread):
+    """Сообщения в очереди: (changed, removed) — списки путей PDF."""
+
+    def __init__(self, folder, index, interval: float = 5.0):
+        super().__init__(daemon=True)
+        self.folder = Path(folder)
+        self.index = index
+        self.interval = interval
+        self.queue = queue.Queue()
+        self._halt = threading.Event()
+        # свой снимок папки: индекс общий, его обновляет и GUI (смена месяца, сверка
+        # при старте) — сравнение «до/после» по индексу пропускало бы изменения
+        self._seen = index.files(self.folder)   # имя -> (size, mtime_ns) при прошлом опросе
+        self._pending = set()     # новые/изменённые, ещё не «дозревшие» файлы
+
+    def stop(self):
+        self._halt.set()
+
+    def stopped(self) -> bool:
+        return self._halt.is_set()
+
+    def poll(self):
+        """Один опрос папки (вызывается из run(); отдельно — для проверки)."""
+        self.index.refresh(self.folder, full=True)
+        now = self.index.files(self.folder)
+        ready = []
+        for name, sig in now.items():
+            if self._seen.get(name) != sig:
+                # новый или изменился с прошлого опроса — ждём, пока докопируется
+                self._pending.add(name)
+            elif name in self._pending:
+                # не менялся между двумя опросами — готов
+                self._pending.discard(name)
+                ready.append(self.folder / name)
+        removed = []
+        for name in self._seen:
+            if name not in now:
+                removed.append(self.folder / name)
+                self._pending.discard(name)
+        self._seen = now
+
+        if ready or removed:
+            self.queue.put((ready, removed))
+
+    def run(self):
+        while not self._halt.wait(self.interval):
+            try:
+                self.poll()
+            except OSError:
+                # папка временно недоступна (сеть) — попробуем в следующий раз
+                continue
+
+    def drain(self):
+        """Забрать все накопившиеся сообщения без ожидания."""
+        out = []
+        while True:
+            try:
+                out.append(self.queue.get_nowait())
+            except queue.Empty:
+                return out
@@ -0,0 +1,165 @@
+"""
+SQLite-хранилище склада (stdlib sqlite3): ledger, закрытые месяцы, материалы.
+
+Тот же интерфейс, что у LedgerStore (load / commit / save_snapshot): состояние
+читается целиком в память (StateRepository), отличие — формат на диске и
+запись операции одной транзакцией вместо дозаписи в журнал и снимков.
+"""
+import json
+import sqlite3
+from pathlib import Path
+
+from kumex.core.ledger import apply_event, normalize_stock_data, recompute_balances, set_checkpoint
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ledger (
+    id        INTEGER PRIMARY KEY,
+    ts        TEXT,
+    month     TEXT,
+    material  TEXT,
+    type      TEXT,
+    amount_m2 REAL,
+    note      TEXT
+);
+CREATE INDEX IF NOT EXISTS ledger_type     ON ledger(type, month);
+CREATE TABLE IF NOT EXISTS closed_months (month TEXT PRIMARY KEY);
+CREATE TABLE IF NOT EXISTS materials (
+    name      TEXT PRIMARY KEY,
+    enabled   INTEGER,
+    stock_m3  REAL,
+    remain_m3 REAL
+);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+_LEDGER_COLS = ("ts", "month", "material", "type", "amount_m2", "note")
+
+
+def _row_to_rec(row) -> dict:
+    # пустые колонки не возвращаем — запись выглядит так же, как в JSON
+    return {k: v for k, v in zip(_LEDGER_COLS, row) if v is not None}
+
+
+class SqliteLedgerStore:
+    def __init__(self, db_path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(_SCHEMA)
+        self.rebuilt_balances = False   # load() пересчитал остатки, которых нет в meta
+
+    def close(self):
+        self.conn.close()
+
+    def watched_paths(self) -> tuple:
+        # в режиме WAL запись сначала попадает в файл -wal
+        return self.db_path, self.db_path.with_name(self.db_path.name + "-wal")
+
+    # ---------- meta ----------
+
+    def _get_meta(self, key, default=None):
+        row = self.conn.execute("SELECT value FROM meta WHERE key=?", (key,)).fetchone()
+        return json.loads(row[0]) if row else default
+
+    def _set_meta(self, key, value):
+        self.conn.execute("INSERT OR REPLACE INTO meta(key, value) VALUES(?, ?)", (key, json.dumps(value)))
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM materials LIMIT 1").fetchone() is None and \
+            self.conn.execute("SELECT 1 FROM ledger LIMIT 1").fetchone() is None
+
+    def _entries(self) -> list:
+        cur = self.conn.execute(f"SELECT {', '.join(_LEDGER_COLS)} FROM ledger ORDER BY id")
+        return [_row_to_rec(r) for r in cur]
+
+    # ---------- интерфейс LedgerStore ----------
+
+    def load(self) -> dict:
+        """Состояние в той же структуре, что kumex_stock.json."""
+        data = {"materials": {}}
+        for name, enabled, stock, remain in self.conn.execute(
+                "SELECT name, enabled, stock_m3, remain_m3 FROM materials"):
+            data["materials"][name] = {"enabled": bool(enabled), "stock_m3": stock, "remain_m3": remain}
+        data["ledger"] = self._entries()
+        data["closed_months"] = [r[0] for r in self.conn.execute("SELECT month FROM closed_months ORDER BY rowid")]
+        data = normalize_stock_data(data)
+        balances = self._get_meta("balances")
+        self.rebuilt_balances = balances is None
+        if balances is None:
+            recompute_balances(data)
+        else:
+            data["balances"] = balances
+            checkpoint = self._get_meta("checkpoint")
+            if checkpoint is not None:
+                data["checkpoint"] = checkpoint
+        return data
+
+    def _write_event(self, ev: dict):
+        op = ev.get("op")
+        if op == "append":
+            rec = ev["rec"]
+            self.conn.execute(
+                f"INSERT INTO ledger({', '.join(_LEDGER_COLS)}) VALUES(?, ?, ?, ?, ?, ?)",
+                tuple(rec.get(c) for c in _LEDGER_COLS))
+        elif op == "delete_month_calc":
+            self.conn.execute("DELETE FROM ledger WHERE type='month_calc' AND month=?", (ev.get("month"),))
+            self.conn.execute("DELETE FROM closed_months WHERE month=?", (ev.get("month"),))
+        elif op == "close_month":
+            self.conn.execute("INSERT OR IGNORE INTO closed_months(month) VALUES(?)", (ev.get("month"),))
+
+    def _write_materials(self, data):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO materials(name, enabled, stock_m3, remain_m3) VALUES(?, ?, ?, ?)",
+            [(name, int(bool(m.get("enabled", True))), m.get("stock_m3", 0.0), m.get("remain_m3", 0.0))
+             for name, m in data.get("materials", {}).items()])
+
+    def commit(self, data, events: list):
+        """Одна транзакция на операцию; остатки обновляются по дельтам."""
+        if not events:
+            return
+        with self.conn:
+            for ev in events:
+                self._write_event(ev)
+                apply_event(data, ev)
+            self._set_meta("balances", data.get("balances"))
+            if "checkpoint" in data:
+                # удаление month_calc сдвигает checkpoint
+                self._set_meta("checkpoint", data["checkpoint"])
+            self._write_materials(data)
+
+    def save_snapshot(self, data):
+        """Для SQLite — сохранить материалы, остатки и checkpoint (ledger уже в базе)."""
+        set_checkpoint(data)
+        with self.conn:
+            self._set_meta("balances", data.get("balances"))
+            self._set_meta("checkpoint", data.get("checkpoint"))
+            self._write_materials(data)
+
+    def import_state(self, data):
+        """Залить целиком структуру склада (используется миграцией из JSON)."""
+        data = normalize_stock_data(data)
+        if "balances" not in data:
+            recompute_balances(data)
+        set_checkpoint(data)
+        with self.conn:
+            self.conn.execute("DELETE FROM ledger")
+            self.conn.execute("DELETE FROM closed_months")
+            self.conn.executemany(
+                f"INSERT INTO ledger({', '.join(_LEDGER_COLS)}) VALUES(?, ?, ?, ?, ?, ?)",
+                [tuple(r.get(c) for c in _LEDGER_COLS) for r in data.get("ledger", [])])
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO closed_months(month) VALUES(?)",
+                [(m,) for m in data.get("closed_months", [])])
+            self._write_materials(data)
+            self._set_meta("balances", data["balances"])
+            self._set_meta("checkpoint", data["checkpoint"])
+
+
+def migrate_json_to_sqlite(json_store, db_path) -> "SqliteLedgerStore":
+    """Одноразовый перенос kumex_stock.json (+ журнал) в SQLite; JSON-файлы не трогаются."""
+    store = SqliteLedgerStore(db_path)
+    if store.is_empty():
+        store.import_state(json_store.load())
+    return store
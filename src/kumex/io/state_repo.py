@@ -0,0 +1,93 @@
+"""
+Состояние склада в памяти поверх хранилища (LedgerStore / SqliteLedgerStore).
+
+Данные читаются с диска один раз и дальше отдаются из памяти; повторное
+чтение — только если файлы хранилища изменил кто-то другой (сверка mtime/size).
+Изменения пишутся сразу в хранилище (write-through).
+
+Правки «на месте» (нормализация при старте, пересчёт остатков) отслеживаются
+сравнением содержимого с тем, что было прочитано/записано (и флагом хранилища
+rebuilt_balances — остатки пересчитаны при чтении): save_if_dirty()
+переписывает снимок, только если состояние действительно изменилось, — обычный
+запуск ничего не пишет (AppData бывает сетевой/синхронизируемой).
+"""
+import json
+import os
+
+
+def _file_sig(path):
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def _fingerprint(data) -> str:
+    """Содержимое состояния для сравнения. ledger — только длина: записи журнала
+    меняются лишь событиями (commit), а полная сериализация стоила бы O(ledger)."""
+    head = {k: v for k, v in data.items() if k != "ledger"}
+    head["ledger_len"] = len(data.get("ledger", []))
+    return json.dumps(head, sort_keys=True, ensure_ascii=False, default=str)
+
+
+class StateRepository:
+    def __init__(self, store):
+        self.store = store
+        self._data = None
+        self._sig = None
+        self._clean = None      # _fingerprint состояния, совпадающего с диском
+
+    def _signature(self):
+        return tuple(_file_sig(p) for p in self.store.watched_paths())
+
+    def get(self) -> dict:
+        """Текущее состояние склада (тот же объект, пока файлы не менялись извне)."""
+        sig = self._signature()
+        if self._data is None or sig != self._sig:
+            self._data = self.store.load()
+            self._sig = self._signature()
+            # остатки посчитаны при чтении, на диске их нет — снимок записать (save_if_dirty)
+            self._clean = None if self.store.rebuilt_balances else _fingerprint(self._data)
+        return self._data
+
+    def invalidate(self):
+        self._data = None
+
+    def commit(self, events: list) -> dict:
+        """Применить события: запись в хранилище + то же изменение в памяти."""
+        data = self.get()
+        try:
+            self.store.commit(data, events)
+        except Exception:
+            # в памяти могло остаться частично применённое — перечитаем с диска
+            self.invalidate()
+            raise
+        self._sig = self._signature()
+        self._clean = _fingerprint(data)
+        return data
+
+    def save_snapshot(self) -> dict:
+        data = self.get()
+        try:
+            self.store.save_snapshot(data)
+        except Exception:
+            self.invalidate()
+            raise
+        self._sig = self._signature()
+        self._clean = _fingerprint(data)
+        return data
+
+    def is_dirty(self) -> bool:
+        """Состояние в памяти изменено на месте и ещё не записано."""
+        return self._data is not None and _fingerprint(self._data) != self._clean
+
+    def save_if_dirty(self) -> bool:
+        """Снимок — только если есть незаписанные изменения; True, если запись была."""
+        if not self.is_dirty():
+            return False
+        self.save_snapshot()
+        return True
+
+    def is_month_closed(self, month: str) -> bool:
+        return month in self.get().get("closed_months", [])
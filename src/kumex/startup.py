@@ -0,0 +1,152 @@
+"""
+Замер холодного старта GUI (флаг --startup-report у "Kumex Ladu.py").
+
+Время импорта каждого модуля — как `python -X importtime` (собственное и
+с вложенными импортами), плюс отметки этапов запуска. Работает и в one-file
+сборке PyInstaller, где ключ -X интерпретатору не передать.
+"""
+import sys
+import time
+from importlib.abc import MetaPathFinder
+
+# цель холодного старта: от начала замера до первой отрисовки окна, мс
+STARTUP_TARGET_MS = 1000
+
+
+class _TimedLoader:
+    """Обёртка загрузчика: время create_module/exec_module модуля."""
+
+    def __init__(self, loader, name, timer):
+        self._loader = loader
+        self._name = name
+        self._timer = timer
+
+    def __getattr__(self, attr):
+        # get_resource_reader, get_data и т.п. — у исходного загрузчика
+        return getattr(self._loader, attr)
+
+    def create_module(self, spec):
+        create = getattr(self._loader, "create_module", None)
+        if create is None:
+            return None
+        with self._timer.timing(self._name):
+            return create(spec)
+
+    def exec_module(self, module):
+        with self._timer.timing(self._name):
+            self._loader.exec_module(module)
+
+
+class _Timing:
+    def __init__(self, timer, name):
+        self.timer = timer
+        self.name = name
+
+    def __enter__(self):
+        self.timer._stack.append(0.0)      # время вложенных импортов
+        self.t0 = time.perf_counter()
+
+    def __exit__(self, *exc):
+        cum = time.perf_counter() - self.t0
+        nested = self.timer._stack.pop()
+        if self.timer._stack:
+            self.timer._stack[-1] += cum
+        self.timer.add(self.name, cum - nested, cum, len(self.timer._stack))
+        return False
+
+
+class ImportTimer(MetaPathFinder):
+    """Первый в sys.meta_path: находит модуль остальными искателями и оборачивает загрузчик."""
+
+    def __init__(self):
+        self.records = {}       # имя -> [self_s, cum_s, глубина]
+        self.order = []         # имена в порядке завершения импорта
+        self._stack = []
+        self._busy = False
+
+    def timing(self, name):
+        return _Timing(self, name)
+
+    def add(self, name, self_s, cum_s, depth):
+        rec = self.records.get(name)
+        if rec is None:
+            self.records[name] = [self_s, cum_s, depth]
+            self.order.append(name)
+        else:
+            # у модулей-расширений отдельно create_module и exec_module
+            rec[0] += self_s
+            rec[1] += cum_s
+
+    def find_spec(self, name, path=None, target=None):
+        if self._busy:
+            return None
+        self._busy = True
+        try:
+            for finder in sys.meta_path:
+                if finder is self or not hasattr(finder, "find_spec"):
+                    continue
+                spec = finder.find_spec(name, path, target)
+                if spec is not None:
+                    break
+            else:
+                return None
+        finally:
+            self._busy = False
+        if spec.loader is not None and hasattr(spec.loader, "exec_module"):
+            spec.loader = _TimedLoader(spec.loader, name, self)
+        return spec
+
+    def install(self):
+        sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        if self in sys.meta_path:
+            sys.meta_path.remove(self)
+
+
+class StartupReport:
+    """Отметки этапов запуска и время импортов; отчёт — текстом в файл/stderr."""
+
+    def __init__(self):
+        self.t0 = time.perf_counter()
+        self.marks = []
+        self.timer = ImportTimer()
+
+    @classmethod
+    def begin(cls) -> "StartupReport":
+        report = cls()
+        report.timer.install()
+        return report
+
+    def mark(self, name: str):
+        self.marks.append((name, time.perf_counter() - self.t0))
+
+    def elapsed_ms(self) -> float:
+        return (self.marks[-1][1] if self.marks else 0.0) * 1000
+
+    def format(self, top: int = 30) -> str:
+        lines = ["Kumex käivitus (ms alates mõõtmise algusest)"]
+        for name, t in self.marks:
+            lines.append(f"  {t * 1000:8.1f}  {name}")
+        total = self.elapsed_ms()
+        verdict = "OK" if total <= STARTUP_TARGET_MS else "ÜLE EESMÄRGI"
+        lines.append(f"eesmärk {STARTUP_TARGET_MS} ms: {total:.0f} ms — {verdict}")
+        lines.append("")
+        lines.append(f"aeglasemad impordid (top {top}, nagu -X importtime)")
+        lines.append("import time: self [us] | cumulative | imported package")
+        recs = sorted(self.timer.records.items(), key=lambda kv: kv[1][1], reverse=True)[:top]
+        for name, (self_s, cum_s, depth) in recs:
+            lines.append(f"import time: {self_s * 1e6:9.0f} | {cum_s * 1e6:10.0f} | {'  ' * depth}{name}")
+        return "\n".join(lines) + "\n"
+
+    def finish(self, path=None) -> str:
+        """Остановить замер и записать отчёт (path и stderr, если он есть)."""
+        self.timer.uninstall()
+        text = self.format()
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        if sys.stderr is not None:
+            # в оконной сборке stderr нет — только файл
+            sys.stderr.write(text)
+        return text
@@ -1,13 +1,33 @@
 
-import os
+import threading
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 from datetime import datetime
 from pathlib import Path
-import time
-import re
-from kumex.io.pdf_reader import read_pdf_text
-from kumex.io.file_ops import load_json, save_json
+from kumex.core.aggregator import parse_kerf
+from kumex.core.fixed import format_units, parse_units, units_to_float
+from kumex.core.ledger import (
+    append_event, close_month_events, current_balances, is_month_closed, keep_stock_materials, recompute_balances,
+    verify_balances,
+)
+from kumex.core.layout_parser import parse_layout
+from kumex.core.parser import PARSER_BACKENDS, ParsedRow, parse_order_month, parse_text
+from kumex.core.row_store import RowStore
+from kumex.io.file_ops import default_state_dir, load_json, load_json_lenient, save_json, save_json_atomic
+from kumex.io.ledger_store import BACKENDS, open_store
+from kumex.io.state_repo import StateRepository
+from kumex.io.pdf_reader import PROFILES, read_pdf_layout, read_pdf_text, warm_up as pdf_warm_up
+from kumex.io.pdf_index import MONTH_MODES, PdfIndex
+from kumex.io.pdf_watch import FolderWatcher
+from kumex.io.parse_cache import ParseCache, cache_variant
+from kumex.ui.parse_worker import ParseWorker
+from kumex.ui.views import KeyedTreeUpdater, LedgerView
+
+# пауза в наборе толщины пилы перед пересчётом м², мс
+CALC_DELAY_MS = 200
+
+# формат kumex_session.json (снимок последнего разобранного месяца)
+SESSION_VERSION = 1
 
 
 class MainWindow(tk.Frame):
@@ -19,8 +39,9 @@ class MainWindow(tk.Frame):
         self.status_var = tk.StringVar(value="Valmis")
         # Толщина пилы (мм) — влияет на конвертацию в м²
         self.kerf_mm_var = tk.StringVar(value="0.00")
-        # При изменении значения пересчитываем конвертацию
-        self.kerf_mm_var.trace_add("write", lambda *a: self._calc_m2())
+        # При изменении значения пересчитываем конвертацию (после паузы в наборе)
+        self._calc_after = None
+        self.kerf_mm_var.trace_add("write", lambda *a: self._schedule_calc_m2())
         # Окно "Настройка склада" (пересоздаём по мере закрытия)
         self._stock_win = None
 
@@ -28,13 +49,17 @@ class MainWindow(tk.Frame):
         # Настройки склада Kumex (минимум: два материала) — пока без логики
 
         self.pdf_files = []          # список путей найденных PDF
-        self.material_rows = []      # сюда позже положим строки из PDF-парсера
+        self.material_rows = RowStore()      # строки из PDF-парсера (колонки для пересчёта)
+        self._rows_by_file = {}      # имя PDF -> строки (для снимка сеанса)
+        self._foreign_pdfs = set()
+        self._parse_worker = None    # фоновый разбор PDF текущего месяца
+        self._awaiting_parse = False # на экране снимок прошлого сеанса, сверка ещё идёт
+        self._watcher = None         # опрос папки PDF на новые файлы
 
 
             # --- пути и состояние ---
         # База состояния: %APPDATA%\Kumex
-        appdata = Path(os.getenv("APPDATA") or Path.home() / "AppData" / "Roaming")
-        self.state_dir = appdata / "Kumex"
+        self.state_dir = default_state_dir()
         self.state_dir.mkdir(parents=True, exist_ok=True)
 
         # Папка по умолчанию для PDF внутри APPDATA (можно менять в GUI)
@@ -42,31 +67,45 @@ class MainWindow(tk.Frame):
 
         self.config_path = self.state_dir / "kumex_config.json"
         self.stock_path = self.state_dir / "kumex_stock.json"
-        stock_data = load_json(self.stock_path, default={"materials": {}})
-
-        # Оставляем в интерфейсе только два материала
-        allowed = {"POM Valge", "POM Must"}
-        mats = stock_data.get("materials", {})
-        filtered = {k: v for k, v in mats.items() if k in allowed}
-        if filtered != mats:
-            stock_data["materials"] = filtered
-            save_json(self.stock_path, stock_data)
-        if not stock_data["materials"]:
-            stock_data["materials"] = {
-                "POM Valge": {"enabled": True, "stock_m3": 0.0, "remain_m3": 0.0},
-                "POM Must":  {"enabled": True, "stock_m3": 0.0, "remain_m3": 0.0}
-            }
-            save_json(self.stock_path, stock_data)
-
-            
-        # если вообще пусто — создадим по умолчанию
-        if not stock_data["materials"]:
-            stock_data["materials"] = {
-                "POM Valge": {"enabled": True, "stock_m3": 0.0, "remain_m3": 0.0},
-                "POM Must":  {"enabled": True, "stock_m3": 0.0, "remain_m3": 0.0}
-            }
-            save_json(self.stock_path, stock_data)
-
+        # кэш разбора PDF: повторный выбор месяца не открывает PDF заново
+        self.cache_path = self.state_dir / "kumex_parse_cache.json"
+        # индекс папки PDF по месяцам: смена месяца не обходит (сетевую) папку
+        self.pdf_index = PdfIndex(self.state_dir / "kumex_pdf_index.json")
+        # итог последнего разбора месяца: показывается сразу при следующем запуске
+        self.session_path = self.state_dir / "kumex_session.json"
+        _cfg = load_json(self.config_path, default={})
+        # хранилище склада: "json" — снимок + журнал (kumex_ledger.jsonl), "sqlite" — kumex_stock.sqlite3
+        self.storage_backend = _cfg.get("storage", "json")
+        if self.storage_backend not in BACKENDS:
+            self.storage_backend = "json"
+        self.ledger_store = open_store(self.state_dir, self.storage_backend)
+        # склад в памяти: файл читается один раз за сессию (и при изменении извне)
+        self.state = StateRepository(self.ledger_store)
+        # профиль извлечения: "order" — только область таблицы заказа, "full" — все страницы целиком
+        self.pdf_profile_name = _cfg.get("pdf_profile", "order")
+        if self.pdf_profile_name not in PROFILES:
+            self.pdf_profile_name = "order"
+        # разбор: "text" — по тексту, "layout" — по координатам слов (колонки таблицы)
+        self.parser_backend = _cfg.get("parser_backend", "text")
+        if self.parser_backend not in PARSER_BACKENDS:
+            self.parser_backend = "text"
+        self.parse_cache = ParseCache(
+            self.cache_path,
+            verify_hash=bool(_cfg.get("cache_verify_sha256", False)),
+            variant=cache_variant(self.pdf_profile_name, self.parser_backend),
+        )
+        # число процессов для извлечения текста (None — по числу ядер)
+        self.parse_workers = _cfg.get("parse_workers") or None
+        # к какому месяцу относить PDF: "mtime" — по времени файла, "order_date" — по дате заказа
+        self.month_by = _cfg.get("month_by", "mtime")
+        if self.month_by not in MONTH_MODES:
+            self.month_by = "mtime"
+        # период опроса папки PDF на новые заказы, с (0 — не следить)
+        self.watch_interval = float(_cfg.get("watch_interval_sec", 5) or 0)
+        stock_data = self.state.get()
+
+        # Оставляем в интерфейсе только два материала (запишется ниже, если что-то поменялось)
+        keep_stock_materials(stock_data)
 
         # строим Tkinter-переменные для GUI на основе JSON
         self.materials_cfg = {}
@@ -88,10 +127,11 @@ class MainWindow(tk.Frame):
         # --- загрузка конфига / дефолтов ---
         self._load_defaults()
         
-        # при старте подтянуть остатки из JSON
+        # при старте подтянуть остатки из JSON; файл склада переписывается,
+        # только если нормализация/пересчёт остатков что-то изменили
         _data = self._load_stock_data()
         self._recompute_balances_from_ledger(_data)
-        self._save_stock_data(_data)
+        self.state.save_if_dirty()
         self._update_negative_highlight()
         
         # --- построение интерфейса ---
@@ -100,6 +140,12 @@ class MainWindow(tk.Frame):
         # --- обработчик закрытия: сохранить конфиг ---
         self.master.protocol("WM_DELETE_WINDOW", self._on_exit)
 
+        # pdfplumber грузится лениво — подогреть в фоне, когда окно уже на экране
+        self.after_idle(self._warm_up_pdf)
+
+    def _warm_up_pdf(self):
+        threading.Thread(target=pdf_warm_up, daemon=True).start()
+
     # ---------------- UI ----------------
 
     def _build_ui(self):
@@ -192,10 +238,12 @@ class MainWindow(tk.Frame):
         self.mat_tree.column("po", width=100, anchor="center")
         self.mat_tree.column("date", width=100, anchor="center")
 
-        mat_scroll = ttk.Scrollbar(mat_group, orient="vertical", command=self.mat_tree.yview)
-        self.mat_tree.configure(yscrollcommand=mat_scroll.set)
+        self._mat_scroll = ttk.Scrollbar(mat_group, orient="vertical", command=self.mat_tree.yview)
+        self.mat_tree.configure(yscrollcommand=self._mat_scroll.set)
         self.mat_tree.grid(row=1, column=0, sticky="nsew", padx=(8, 0), pady=8)
-        mat_scroll.grid(row=1, column=1, sticky="ns", pady=8)
+        self._mat_scroll.grid(row=1, column=1, sticky="ns", pady=8)
+        # строки таблицы по ключу (файл, строка PDF): при повторном разборе меняется только разница
+        self._mat_table = KeyedTreeUpdater(self.mat_tree)
         # --- Нижняя панель: слева — склад Kumex (ввод), справа — конвертация в м² (вывод) ---
         bottom_frame = ttk.Frame(container)
         bottom_frame.grid(row=6, column=0, columnspan=3, sticky="nsew", pady=(8, 0))
@@ -299,9 +347,10 @@ class MainWindow(tk.Frame):
 
         # колонки
         container.columnconfigure(1, weight=1)
-        
-        self._scan_pdfs()
-        # первичная проверка (на случай, если месяц уже закрыт)
+
+        # прошлый сеанс — на экран сразу, папка сверяется и PDF разбираются в фоне
+        restored = self._restore_session()
+        self._revalidate(live=restored)
 
     # ------------- Загрузка/сохранение конфигурации -------------
 
@@ -322,10 +371,12 @@ class MainWindow(tk.Frame):
 
     def _save_config(self):
         self.state_dir.mkdir(parents=True, exist_ok=True)
-        data = {
+        # сохраняем прочие ключи (напр. cache_verify_sha256), которые GUI не редактирует
+        data = load_json(self.config_path, default={})
+        data.update({
             "pdf_dir": self.pdf_dir_var.get().strip()
             , "kerf_mm": float(self.kerf_mm_var.get().strip() or "1")
-        }
+        })
         save_json(self.config_path, data)
         # ---------------- Служебные обработчики ----------------
 
@@ -339,10 +390,72 @@ class MainWindow(tk.Frame):
                 self._save_config()
                 messagebox.showinfo("Kumex", "Kaust salvestatud vaikimisi teeks.")
 
-    def _scan_pdfs(self):
+    # ------------- Снимок сеанса -------------
+
+    def _session_key(self) -> dict:
+        """Условия, при которых снимок прошлого сеанса годится для текущего окна."""
+        return {
+            "month": self._month_key(),
+            "pdf_dir": self.pdf_dir_var.get().strip(),
+            "variant": self.parse_cache.variant,
+            "month_by": self.month_by,
+        }
+
+    def _save_session(self):
+        """Файлы и строки разобранного месяца (вызывается при выходе)."""
+        if self._parse_worker is not None:
+            return  # разбор не закончен — снимок был бы неполным
+        data = dict(self._session_key(), version=SESSION_VERSION,
+                    files=[p.name for p in self.pdf_files],
+                    rows={name: [r.to_dict() for r in rows] for name, rows in self._rows_by_file.items()})
+        # GUI может быть запущен дважды — запись атомарная
+        save_json_atomic(self.session_path, data)
+
+    def _restore_session(self) -> bool:
+        """Показать снимок прошлого сеанса, если он о том же месяце и папке."""
+        # повреждённый снимок — как отсутствующий: месяц просто разберётся заново
+        snap = load_json_lenient(self.session_path, default={})
+        if snap.get("version") != SESSION_VERSION or \
+                any(snap.get(k) != v for k, v in self._session_key().items()):
+            return False
+        folder = Path(self.pdf_dir_var.get()).expanduser()
+        self.pdf_files = [folder / name for name in snap.get("files", [])]
+        self._show_pdf_list()
+        rows_by_file = snap.get("rows", {})
+        self._mat_table.begin()
+        for p in self.pdf_files:
+            rows = [ParsedRow.from_dict(d) for d in rows_by_file.get(p.name, [])]
+            self._add_file_rows(p.name, rows)
+        self._mat_table.finish()
+        self.mat_count_lbl.config(text=f"Positsioone: {len(self.material_rows)}")
+        self._calc_m2()
+        # итоги снимка не сверены с папкой — фиксировать месяц нельзя до конца разбора
+        self._awaiting_parse = True
+        self._update_calc_button_state()
+        self._set_status(f"Eelmise seansi andmed ({len(self.pdf_files)} PDF) — kontrollin kausta…")
+        return True
+
+    def _revalidate(self, live: bool = False):
+        """Сверить папку с диском в фоновом потоке, затем разобрать месяц (изменённые файлы)."""
+        folder = Path(self.pdf_dir_var.get()).expanduser()
+        t = threading.Thread(target=self.pdf_index.refresh, args=(folder,), daemon=True)
+        t.start()
+        self.after(50, self._poll_revalidate, t, live)
+
+    def _poll_revalidate(self, t, live: bool):
+        if t.is_alive():
+            self.after(50, self._poll_revalidate, t, live)
+            return
+        self._scan_pdfs(live=live)
+        if self._awaiting_parse and self._parse_worker is None:
+            # разбор не запустился (папка недоступна, неверный месяц) — снимок не держит кнопку
+            self._awaiting_parse = False
+            self._update_calc_button_state()
+
+    def _scan_pdfs(self, live: bool = False):
     
         folder = Path(self.pdf_dir_var.get()).expanduser()
-        if not folder.exists():
+        if not self.pdf_index.checked(folder) and not folder.exists():
             messagebox.showerror("Kaust pole kättesaadav", f"Kausta ei eksisteeri:\n{folder}")
             return
 
@@ -355,141 +468,192 @@ class MainWindow(tk.Frame):
         yy = int(yy_str)
         mm = int(mm_str)
 
-        # границы месяца (локальное время)
-        start_ts = time.mktime((yy, mm, 1, 0, 0, 0, 0, 0, -1))
-        if mm == 12:
-            end_ts = time.mktime((yy + 1, 1, 1, 0, 0, 0, 0, 0, -1))
-        else:
-            end_ts = time.mktime((yy, mm + 1, 1, 0, 0, 0, 0, 0, -1))
+        # сбор PDF месяца в папке; обновляем левый список
+        self.pdf_files = self._month_pdf_files(folder, yy, mm)
+        self.pdf_index.save()
+        if self.pdf_index.checked(folder):
+            # записи кэша удалённых из папки PDF (сохранится вместе с результатами разбора)
+            self.parse_cache.prune_folder(folder, self.pdf_index.files(folder))
+        self._show_pdf_list()
+        self._start_watcher(folder)
 
-        # сбор PDF в папке
-        pdfs = []
-        for p in folder.glob("*.pdf"):
-            try:
-                mtime = p.stat().st_mtime
-            except Exception:
-                continue
-            if start_ts <= mtime < end_ts:
-                pdfs.append(p)
+        self._set_status(f"Kaust: {folder} | PDF kuu {yy}-{mm_str}: {len(self.pdf_files)}")
+        # разбор идёт в фоне; итоги и кнопка обновятся в _on_parse_done
+        self._parse_materials(live=live)
 
-        # обновляем левый список
-        self.pdf_files = sorted(pdfs, key=lambda x: x.name.lower())
+    def _month_pdf_files(self, folder, yy: int, mm: int) -> list:
+        if self.month_by == "order_date":
+            # кандидаты: датированные в кэше + ещё не разобранные (лишние отсеются при разборе)
+            return self.pdf_index.order_date_files(folder, yy, mm, self.parse_cache)
+        return self.pdf_index.month_files(folder, yy, mm)
+
+    def _show_pdf_list(self):
         self.pdf_list.delete(0, tk.END)
         for p in self.pdf_files:
             self.pdf_list.insert(tk.END, p.name)
         self.pdf_count_lbl.config(text=f"Leitud: {len(self.pdf_files)}")
 
-        # чистим правый список (материалы добавим позже)
-        self.material_rows = []
-        for iid in self.mat_tree.get_children():
-            self.mat_tree.delete(iid)
-        self.mat_count_lbl.config(text="Positsioone: 0")
-        
-        self._parse_materials()
-
-        self._set_status(f"Kaust: {folder} | PDF kuu {yy}-{mm_str}: {len(self.pdf_files)}")
-        self._calc_m2()
-        self._update_calc_button_state()
-
-    def _parse_materials(self):
+    def _start_watcher(self, folder):
+        """Следить за папкой PDF (новые заказы подхватываются без смены месяца)."""
+        if self.watch_interval <= 0:
+            return
+        if self._watcher is not None:
+            if self._watcher.folder == folder:
+                return
+            self._watcher.stop()
+        self._watcher = FolderWatcher(folder, self.pdf_index, interval=self.watch_interval)
+        self._watcher.start()
+        self.after(1000, self._poll_watcher, self._watcher)
+
+    def _poll_watcher(self, watcher):
+        if watcher is not self._watcher:
+            return  # папку сменили
+        changes = watcher.drain()
+        if changes:
+            self._on_folder_change(watcher.folder, changes)
+        self.after(1000, self._poll_watcher, watcher)
+
+    def _on_folder_change(self, folder, changes):
+        """В папке появились/изменились/исчезли PDF — перечитать текущий месяц, если он затронут."""
+        yy_str = self.year_var.get().strip()
+        mm_str = self.month_num_var.get().strip()
+        if not (yy_str.isdigit() and mm_str.isdigit()):
+            return
+        files = self._month_pdf_files(folder, int(yy_str), int(mm_str))
+        self.pdf_index.save()
+        changed = {str(p) for ready, _removed in changes for p in ready}
+        # self.pdf_files — после разбора, без PDF с датой заказа другого месяца (order_date);
+        # сравнивать с тем же отбором, иначе любое изменение в папке перечитывало бы месяц
+        shown = [p for p in files if p not in self._foreign_pdfs or str(p) in changed]
+        if shown == self.pdf_files and not any(str(p) in changed for p in shown):
+            return  # изменения в другом месяце
+        self.pdf_files = files
+        self._show_pdf_list()
+        # разбираются только новые/изменённые файлы, остальные берутся из кэша
+        self._parse_materials(live=True)
+
+    def _parse_materials(self, live: bool = False):
     
-        # очистка списка перед циклом (важно не чистить внутри)
-        for iid in self.mat_tree.get_children():
-            self.mat_tree.delete(iid)
-        self.material_rows = []
+        # прежний разбор (другой месяц) больше не нужен
+        self._cancel_parse()
+
+        # таблицу не чистим: старые строки остаются, пока разбор не дойдёт до их места
+        self._mat_table.begin()
+        self.material_rows = RowStore()
+        self._rows_by_file = {}
+        self._foreign_pdfs = set()   # разобранные PDF с датой заказа другого месяца
+        if not live:
+            # обнулить итоги прошлого месяца, пока идёт разбор
+            self._calc_m2()
 
         if not self.pdf_files:
             self._set_status("Kõigepealt vajutage „Skaneeri PDF“.")
+            self._mat_table.finish()
             self.mat_count_lbl.config(text="Positsioone: 0")
+            # итоги прошлого состава месяца не оставлять (live не обнулял их выше)
+            self._calc_m2()
+            self._update_calc_button_state()
             return
 
-        # --- паттерны ---
-        # размеры: 22x22x1000, 40*67*1000, 20x20 (mm необяз.)
-        size_rx = re.compile(r"\b\d+\s*([xX*])\s*\d+(?:\s*\1\s*\d+)?(?:\s*mm\b)?")
-        # qty на той же/след. строке: qty=2000, QTY 2000, Quantity: 70
-        qty_any_rx = re.compile(r"\b(?:qty|quantity)\s*[:=]?\s*(\d{1,7})\b", re.IGNORECASE)
-        # табличный вариант в строке выше: "1 70056 2000 ..." (индекс, partno, qty)
-        qty_row_above_rx = re.compile(r"^\s*\d+\s+\S+\s+(\d{1,7})\b")
-        # PO и дата (разные варианты написания)
-        po_rx = re.compile(r"\bPO(?:\s*(?:Number|No\.?)|)\s*[:#]?\s*([A-Za-z0-9_-]+)")
-        date_rx = re.compile(r"\b(?:Order\s*Date|Date)\s*[:#]?\s*([0-9]{1,2}[.\-/][0-9]{1,2}[.\-/][0-9]{2,4})")
-
-        total = 0
-
-        for p in self.pdf_files:
-            text = read_pdf_text(str(p))
-            if not text:
-                continue
-
-            po = (po_rx.search(text).group(1) if po_rx.search(text) else "?")
-            od = (date_rx.search(text).group(1) if date_rx.search(text) else "?")
+        self._parse_worker = ParseWorker(
+            self.pdf_files, self._cached_rows, self._ingest_text,
+            workers=self.parse_workers, profile=PROFILES[self.pdf_profile_name],
+            reader=read_pdf_layout if self.parser_backend == "layout" else read_pdf_text,
+        )
+        self._update_calc_button_state()
+        self._parse_worker.start()
+        self.after(50, self._poll_parse_worker, self._parse_worker)
 
-            lines = [ln.strip() for ln in text.splitlines()]
-            n = len(lines)
+    # два метода ниже вызываются из фонового потока — без обращения к виджетам
 
-            for i, line in enumerate(lines):
-                # ищем строку-описание по наличию размеров
-                if not size_rx.search(line):
-                    continue
+    def _cached_rows(self, p):
+        """Строки PDF из кэша или None, если файл ещё не разбирался/изменился."""
+        # размер/mtime — из индекса папки, без stat() по сети
+        hit = self.parse_cache.get(p, st=self.pdf_index.stat(p))
+        return None if hit is None else [ParsedRow.from_dict(d) for d in hit.get("rows", [])]
 
-                desc = line
-                qty = None
-
-                # 1) qty на этой же строке
-                m = qty_any_rx.search(line)
-                if m:
-                    qty = int(m.group(1))
-
-                # 2) если не нашли — ищем на 1..3 строках ниже
-                if qty is None:
-                    for j in range(1, 4):
-                        if i + j >= n:
-                            break
-                        m = qty_any_rx.search(lines[i + j])
-                        if m:
-                            qty = int(m.group(1))
-                            break
-
-                # 3) если не нашли — пробуем табличный вариант в 1..2 строках выше
-                if qty is None:
-                    for j in (1, 2):
-                        if i - j >= 0:
-                            m = qty_row_above_rx.match(lines[i - j])
-                            if m:
-                                qty = int(m.group(1))
-                                break
-
-                if qty is None:
-                    # не смогли уверенно найти количество — пропускаем позицию
+    def _ingest_text(self, p, data) -> list:
+        """Разбор извлечённого из PDF (текст или слова) и запись результата в кэш."""
+        if self.parser_backend == "layout":
+            rows, text = parse_layout(data or [])
+        else:
+            text = data or ""
+            rows = parse_text(text)
+        self.parse_cache.put(p, [r.to_dict() for r in rows], order_month=parse_order_month(text))
+        return rows
+
+    def _poll_parse_worker(self, worker):
+        """Переносит готовые пачки строк из фонового потока в таблицу."""
+        if worker is not self._parse_worker or worker.cancelled():
+            return  # месяц сменили — результаты устарели
+
+        finished = False
+        for kind, done, files in worker.drain():
+            items = []
+            for path, rows in files:
+                if self.month_by == "order_date" and \
+                        self.pdf_index.doc_month(path, self.parse_cache) not in (None, self._month_key()):
+                    self._foreign_pdfs.add(path)
                     continue
-
-                # сохраняем как словарь (на будущее для отчётов)
-                # определяем материал
-                d = desc.lower()
-                if "pom" in d and "valge" in d:
-                    mat_name = "POM Valge"
-                elif "pom" in d and ("must" in d or "õhuke" in d):
-                    mat_name = "POM Must"
-                else:
-                    mat_name = ""  # всё остальное (PET, Messing, ESD-only и т.д.) не считать
-                # + отдельно: если "esd" in d: mat_name = ""
-
-
-                # сохраняем как словарь (для последующего расчёта)
-                self.material_rows.append({
-                    "desc": desc,
-                    "qty": qty,
-                    "po": po,
-                    "date": od,
-                    "material": mat_name
-                })
-                
-                # добавляем строку в таблицу
-                self.mat_tree.insert("", "end", values=(desc, qty, po, od))
-                total += 1
-
+                items.extend(self._add_file_rows(Path(path).name, rows, feed=False))
+            self._feed_mat_rows(items)
+            self.mat_count_lbl.config(text=f"Positsioone: {len(self.material_rows)}")
+            self._set_status(f"Töötlen PDF: {done}/{worker.total} | Leitud positsioone: {len(self.material_rows)}")
+            if kind == "done":
+                finished = True
+
+        if finished:
+            self._on_parse_done(worker)
+        else:
+            self.after(50, self._poll_parse_worker, worker)
+
+    def _add_file_rows(self, name, rows, feed: bool = True) -> list:
+        """Строки одного PDF в material_rows; элементы таблицы — в неё (feed) или вызывающему."""
+        self._rows_by_file[name] = rows
+        items = []
+        for row in rows:
+            self.material_rows.append(row)
+            # порядок ключей = порядок файлов (по имени) и строк в файле
+            items.append(((name.lower(), name, row.line), (row.desc, row.qty, row.po, row.date)))
+        if feed:
+            self._feed_mat_rows(items)
+        return items
+
+    def _feed_mat_rows(self, items):
+        """Пачка строк в таблицу материалов; полоса прокрутки обновляется один раз."""
+        if len(items) > 50:
+            self.mat_tree.configure(yscrollcommand="")
+            try:
+                self._mat_table.feed(items)
+            finally:
+                self.mat_tree.configure(yscrollcommand=self._mat_scroll.set)
+                self._mat_scroll.set(*self.mat_tree.yview())
+        else:
+            self._mat_table.feed(items)
+
+    def _on_parse_done(self, worker):
+        self._parse_worker = None
+        self._awaiting_parse = False
+        # строки, которых больше нет в месяце, убрать
+        self._mat_table.finish()
+        if self._foreign_pdfs:
+            self.pdf_files = [p for p in self.pdf_files if p not in self._foreign_pdfs]
+            self._show_pdf_list()
+        self.parse_cache.save()
+        total = len(self.material_rows)
         self.mat_count_lbl.config(text=f"Positsioone: {total}")
-        self._set_status(f"Töödeldud PDF: {len(self.pdf_files)} | Leitud positsioone: {total}")
+        msg = f"Töödeldud PDF: {worker.total} | Leitud positsioone: {total}"
+        if worker.errors:
+            msg += f" | Vigased PDF: {len(worker.errors)}"
+        self._set_status(msg)
+        self._calc_m2()
+        self._update_calc_button_state()
+        self._update_negative_highlight()
+
+    def _cancel_parse(self):
+        if self._parse_worker is not None:
+            self._parse_worker.cancel()
+            self._parse_worker = None
 
     def _on_date_change(self, *_):
         self._sync_month_var()
@@ -506,76 +670,24 @@ class MainWindow(tk.Frame):
         if len(yy) == 4 and mm in {f"{i:02d}" for i in range(1,13)}:
             self.month_var.set(f"{yy}-{mm}")
 
+    def _schedule_calc_m2(self):
+        """Пересчёт через CALC_DELAY_MS после последнего изменения поля пилы."""
+        if self._calc_after is not None:
+            self.after_cancel(self._calc_after)
+        self._calc_after = self.after(CALC_DELAY_MS, self._calc_m2)
+
     def _calc_m2(self):
         """Пересчитывает площади (m²) по материалам на основе таблицы заказов."""
-        import re
-        from decimal import Decimal, ROUND_HALF_UP
-
-        totals = {"POM Valge": Decimal("0.0"), "POM Must": Decimal("0.0")}
-
-        for row in self.material_rows:
-            desc = str(row.get("desc", ""))
-            qty = int(row.get("qty", 0) or 0)
-            material = row.get("material", "")
-            # Исключаем ESD-материалы из калькуляции (например, "ESD_POM_valge 52x52x1000")
-            
-
-            # считаем только нужные материалы
-            if not any(x in material for x in ["POM Valge", "POM Must"]):
-                continue
-
-            # извлечь все числа
-            nums = [int(x) for x in re.findall(r"\d+", desc)]
-            if len(nums) < 3:
-                continue
-
-            # считаем количество "52"
-            cnt_52 = nums.count(52)
-
-            if cnt_52 == 1:
-                sides = [x for x in nums if x != 52]
-                if len(sides) >= 2:
-                    A, B = sides[0], sides[1]
-                else:
-                    continue
-            elif cnt_52 == 2:
-                non52 = [x for x in nums if x != 52]
-                if len(non52) == 1:
-                    A, B = 52, non52[0]
-                else:
-                    continue
-            elif cnt_52 == 3:
-                A, B = 52, 52
-            else:  # ни одного 52 → берём 2 самые большие стороны
-                sides = sorted(nums, reverse=True)
-                A, B = sides[0], sides[1]
-
-            # Толщина пилы (мм), безопасный парсинг
-            try:
-                kerf = Decimal(str(self.kerf_mm_var.get()).replace(",", "."))
-                if kerf < 0:
-                    kerf = Decimal("0")
-            except Exception:
-                kerf = Decimal("0")
-
-            A_eff = Decimal(A) + kerf
-            B_eff = Decimal(B) + kerf
-
-            # Площадь одной детали с учётом пилы
-            S1 = (A_eff * B_eff) / Decimal(1_000_000)
-            # площадь всех qty
-            Spos = S1 * qty
-
-            # округление только для вывода (сумму храним точно)
-            if "Valge" in material:
-                totals["POM Valge"] += Spos
-            elif "Must" in material:
-                totals["POM Must"] += Spos
+        if self._calc_after is not None:
+            self.after_cancel(self._calc_after)
+            self._calc_after = None
+        # суммы по материалам накоплены при добавлении строк — здесь O(1) по толщине пилы
+        totals = self.material_rows.totals(parse_kerf(self.kerf_mm_var.get()))
 
         # обновляем GUI (с двумя знаками)
         for name, value in totals.items():
-            rounded = value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            self.conv_totals[name].set(str(rounded))
+            if name in self.conv_totals:
+                self.conv_totals[name].set(format_units(value))
 
     def _open_stock_dialog(self):
         """Открывает окно 'Настройка склада' с таблицей журнала операций."""
@@ -671,31 +783,10 @@ class MainWindow(tk.Frame):
         # Кнопка Undo (отмена выбранной записи)
         ttk.Button(topbar, text="Tühista toiming", command=self._undo_selected).pack(side="right", padx=(4, 0))
 
-        cols = ("ts", "month", "material", "action", "amount", "note")
-        self._ledger_tree = ttk.Treeview(frm, columns=cols, show="headings", height=12)
-        self._ledger_tree.heading("ts", text="Kuupäev/aeg")
-        self._ledger_tree.heading("month", text="Kuu")
-        self._ledger_tree.heading("material", text="Materjal")
-        self._ledger_tree.heading("action", text="Toiming")
-        self._ledger_tree.heading("amount", text="m²")
-        self._ledger_tree.heading("note", text="Kommentaar")
-
-        self._ledger_tree.column("ts", width=140, anchor="center")
-        self._ledger_tree.column("month", width=80, anchor="center")
-        self._ledger_tree.column("material", width=120, anchor="w")
-        self._ledger_tree.column("action", width=120, anchor="w")
-        self._ledger_tree.column("amount", width=80, anchor="center")
-        self._ledger_tree.column("note", width=220, anchor="w")
-        
-        # Цветовые теги для строк журнала
-        self._ledger_tree.tag_configure("t_add",   foreground="#0A7D00")  # зелёный  (пополнение)
-        self._ledger_tree.tag_configure("t_sub",   foreground="#A40000")  # красный  (списание)
-        self._ledger_tree.tag_configure("t_month", foreground="#004A9F")  # синий    (расчёт месяца)
-
-        scr = ttk.Scrollbar(frm, orient="vertical", command=self._ledger_tree.yview)
-        self._ledger_tree.configure(yscrollcommand=scr.set)
-        self._ledger_tree.pack(side="left", fill="both", expand=True, pady=(6, 0))
-        scr.pack(side="left", fill="y", pady=(6, 0))
+        # виртуальная таблица: в Treeview только видимые строки, фильтр по месяцу/материалу
+        self._ledger_view = LedgerView(frm, rows=12)
+        self._ledger_view.pack(fill="both", expand=True, pady=(6, 0))
+        self._ledger_view.bind("<<LedgerFilterChanged>>", lambda e: self._show_ledger_count())
 
         # статус внизу
         self._stock_status = tk.StringVar(value="")
@@ -732,48 +823,25 @@ class MainWindow(tk.Frame):
         # --- конец центрирования ---
 
     def _load_stock_data(self):
-        """Гарантированно читаем JSON структуры склада."""
-        data = load_json(self.stock_path, default={})
-        data.setdefault("materials", {})
-        for k in ("POM Valge", "POM Must"):
-            data["materials"].setdefault(k, {})
-            data["materials"][k].setdefault("stock_m3", 0.0)   # тут «м3» — просто имя ключа; фактически м²
-            data["materials"][k].setdefault("remain_m3", 0.0)  # фактически м²
-        data.setdefault("ledger", [])
-        data.setdefault("closed_months", [])
-        return data
-
-    def _save_stock_data(self, data):
-        save_json(self.stock_path, data)
+        """Структура склада из памяти (с диска — только при первом вызове или изменении файлов)."""
+        return self.state.get()
 
     def _recompute_balances_from_ledger(self, data):
-    
-        from decimal import Decimal, ROUND_HALF_UP
-        sums = {"POM Valge": Decimal("0.0"), "POM Must": Decimal("0.0")}
-        for rec in data.get("ledger", []):
-            mat = rec.get("material")
-            if mat not in sums:
-                continue
-            amt = Decimal(str(rec.get("amount_m2", 0)))
-            typ = (rec.get("type") or "").lower()
-            if typ == "manual_add":
-                sums[mat] += amt
-            elif typ == "manual_sub":
-                sums[mat] -= amt
-            elif typ == "month_calc":
-                sums[mat] -= amt
-        # обновим JSON + GUI
-        for mat in ("POM Valge", "POM Must"):
-            v = sums[mat].quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-            data["materials"][mat]["remain_m3"] = float(v)
+        """Полная сверка остатков с журналом (при старте): checkpoint + хвост ledger."""
+        if not verify_balances(data):
+            recompute_balances(data)
+        self._show_balances(data)
+
+    def _show_balances(self, data):
+        """Показать текущие остатки (поддерживаются по дельтам — без перебора ledger)."""
+        for mat, v in current_balances(data).items():
             # если есть поля на форме — обновим
             if mat in self.materials_cfg:
-                self.materials_cfg[mat]["remain_m3"].set(str(v))
+                self.materials_cfg[mat]["remain_m3"].set(format_units(v))
             self._update_negative_highlight()
 
     def _add_stock_operation(self):
         """Добавить запись в журнал: manual_add/manual_sub, пересчитать остатки."""
-        from decimal import Decimal
         import datetime as _dt
 
         mat = self._op_material.get()
@@ -782,10 +850,10 @@ class MainWindow(tk.Frame):
         note = "Käsitsi toiming"
 
 
-        # валидация
+        # валидация (количество — в сотых м², как в журнале)
         try:
-            amount = Decimal(raw)
-        except Exception:
+            amount = parse_units(raw)
+        except ValueError:
             messagebox.showerror("Viga", "Sisestage korrektne number väljale 'Kogus, m²'.")
             return
         if amount <= 0:
@@ -795,21 +863,17 @@ class MainWindow(tk.Frame):
             messagebox.showerror("Viga", "Valige materjal.")
             return
 
-        # читаем/обновляем JSON
-        data = self._load_stock_data()
         rec = {
             "ts": _dt.datetime.now().isoformat(timespec="seconds"),
             "month": f"{self.year_var.get()}-{self.month_num_var.get()}",
             "material": mat,
             "type": "manual_add" if typ == "add" else "manual_sub",
-            "amount_m2": float(amount),
+            "amount_m2": units_to_float(amount),
             "note": note or "Käsitsi toiming"
         }
-        data["ledger"].append(rec)
-
-        # пересчёт и сохранение
-        self._recompute_balances_from_ledger(data)
-        self._save_stock_data(data)
+        # дозапись в журнал и пересчёт
+        data = self.state.commit([append_event(rec)])
+        self._show_balances(data)
         self._update_negative_highlight()
         
         # обновим GUI
@@ -828,35 +892,29 @@ class MainWindow(tk.Frame):
             return
 
         data = self._load_stock_data()
-        # удалить month_calc за месяц
-        before = len(data.get("ledger", []))
-        data["ledger"] = [r for r in data.get("ledger", []) if not (r.get("type") == "month_calc" and r.get("month") == month)]
-        after = len(data["ledger"])
-
-        # убрать месяц из закрытых
-        if "closed_months" in data and month in data["closed_months"]:
-            data["closed_months"].remove(month)
-
-        # пересчёт и сохранение
-        self._recompute_balances_from_ledger(data)
-        self._save_stock_data(data)
+        removed = sum(1 for r in data.get("ledger", [])
+                      if r.get("type") == "month_calc" and r.get("month") == month)
+        if not removed and not is_month_closed(data, month):
+            # удалять нечего — событие в журнал не пишем
+            self._stock_status.set("Kustutatud kirjeid: 0.")
+            return
+        # удалить month_calc за месяц и убрать месяц из закрытых; commit() может
+        # перечитать состояние с диска (его меняли извне) — дальше только его результат
+        data = self.state.commit([{"op": "delete_month_calc", "month": month}])
+
+        # остатки уже обновлены по дельтам — только показать
+        self._show_balances(data)
         self._update_negative_highlight()
 
         self._reload_ledger()
-        self._stock_status.set(f"Kustutatud kirjeid: {before - after}.")
+        self._stock_status.set(f"Kustutatud kirjeid: {removed}.")
         self._update_calc_button_state()
 
     def _undo_selected(self):
         """Инвертировать выбранную запись журнала (manual_add <-> manual_sub)."""
-        sel = getattr(self, "_ledger_tree", None).selection()
-        if not sel:
-            messagebox.showwarning("Tühistamine", "Valige kirje logis.")
-            return
-
-        iid = sel[0]
-        meta = getattr(self, "_ledger_index", {}).get(iid)
+        meta = self._ledger_view.selected()
         if not meta:
-            messagebox.showerror("Viga", "Valitud kirje andmeid ei leitud.")
+            messagebox.showwarning("Tühistamine", "Valige kirje logis.")
             return
 
         raw_type = (meta.get("type") or "").lower()
@@ -879,28 +937,25 @@ class MainWindow(tk.Frame):
                                 f"Kirje tühistamine:\n"
                                 f"Materjal: {material}\n"
                                 f"Toiming: {pretty_action}\n"
-                                f"Объём: {amount} m²\n\n"
+                                f"Объём: {format_units(amount)} m²\n\n"
                                 f"Luua vastupidine korrigeerimine."):
             return
 
         # Готовим инверсию
         inverse_type = "manual_sub" if raw_type == "manual_add" else "manual_add"
 
-        # Читаем JSON, добавляем корректировку, пересчитываем
-        data = self._load_stock_data()
-
+        # Добавляем корректировку, остатки пересчитываются по дельте
         import datetime as _dt
-        data["ledger"].append({
+        data = self.state.commit([append_event({
             "ts": _dt.datetime.now().isoformat(timespec="seconds"),
             "month": month,
             "material": material,
             "type": inverse_type,
-            "amount_m2": float(amount),
+            "amount_m2": units_to_float(amount),
             "note": f"Valitud kirje tühistamine ({pretty_action})",
-        })
+        })])
 
-        self._recompute_balances_from_ledger(data)
-        self._save_stock_data(data)
+        self._show_balances(data)
         self._update_negative_highlight()
         
         # Обновление UI
@@ -908,133 +963,38 @@ class MainWindow(tk.Frame):
         self._stock_status.set("Lisatud vastupidine korrigeerimine.")
 
     def _reload_ledger(self):
-        """Читает ledger из JSON и перерисовывает таблицу журнала."""
+        """Обновляет таблицу журнала из состояния в памяти (новые записи — дозаписью)."""
+        view = getattr(self, "_ledger_view", None)
+        # таблица может не существовать (диалог закрыт)
+        if view is None or not view.winfo_exists():
+            return
         try:
-            data = load_json(self.stock_path, default={"ledger": []})
-            ledger = data.get("ledger", []) or []
+            ledger = self._load_stock_data().get("ledger", []) or []
         except Exception as e:
-            ledger = []
-            if hasattr(self, "_stock_status"):
-                self._stock_status.set(f"Viga чтения JSON: {e}")
-        # Маппинг iid -> «сырые» значения для undo
-        self._ledger_index = {}
-        
-        # дерево журнала может не существовать (диалог закрыт)
-        tree = getattr(self, "_ledger_tree", None)
-        tree_exists = bool(tree) and tree.winfo_exists()
-
-        status_var = getattr(self, "_stock_status", None)
-        stock_win_alive = bool(getattr(self, "_stock_win", None)) and \
-                        tk.Toplevel.winfo_exists(getattr(self, "_stock_win"))
-
-
-        if tree_exists:
-            for iid in tree.get_children():
-                tree.delete(iid)
-
-
-        from decimal import Decimal, ROUND_HALF_UP
-        import datetime as _dt
-
-        def _fmt_amount(v):
-            try:
-                return str(Decimal(v).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP))
-            except Exception:
-                return "0.00"
-
-        cnt = 0
-        for rec in ledger:
-            ts = rec.get("ts") or ""
-            # форматируем ISO в читабельный
-            try:
-                if "T" in ts:
-                    dt = _dt.datetime.fromisoformat(ts)
-                    ts_disp = dt.strftime("%Y-%m-%d %H:%M:%S")
-                else:
-                    ts_disp = ts
-            except Exception:
-                ts_disp = ts
-
-            month = rec.get("month", "")
-            material = rec.get("material", "")
-            typ = (rec.get("type", "") or "").lower()
-            if   typ == "manual_add":
-                action = "Täiendus"
-            elif typ == "manual_sub":
-                action = "Mahakandmine"
-            elif typ == "month_calc":
-                action = "Kuu arvestus"
-            else:
-                action = rec.get("type", "")
-
-            amt = _fmt_amount(rec.get("amount_m2", 0))
-            note = rec.get("note", "")
-
-            if hasattr(self, "_ledger_tree"):
-                # сырой тип для undo
-                raw_type = (rec.get("type", "") or "").lower()
-
-                # тег по типу записи
-                if   raw_type == "manual_add":
-                    row_tag = "t_add"
-                elif raw_type == "manual_sub":
-                    row_tag = "t_sub"
-                elif raw_type == "month_calc":
-                    row_tag = "t_month"
-                else:
-                    row_tag = ""
+            self._stock_status.set(f"Viga чтения JSON: {e}")
+            return
+        view.sync(ledger)
+        self._show_ledger_count()
 
-                # стабильный iid (чтобы строку можно было однозначно выбрать)
-                iid = f"{ts}-{cnt}"
+    def _show_ledger_count(self):
+        view = self._ledger_view
+        if view.shown == view.total:
+            self._stock_status.set(f"Kirjeid logis: {view.total}")
+        else:
+            self._stock_status.set(f"Kirjeid logis: {view.shown} / {view.total}")
 
-                # положим метаданные в индекс для Undo
-                try:
-                    amt_dec = Decimal(str(rec.get("amount_m2", 0) or 0))
-                except Exception:
-                    amt_dec = Decimal("0")
-                self._ledger_index[iid] = {
-                    "ts": ts,
-                    "month": month,
-                    "material": material,
-                    "type": raw_type,
-                    "amount": amt_dec,
-                    "note": note,
-                }
-
-                # ... подготовка iid, row_tag, values как у тебя уже есть ...
-
-                # Вставляем строку безопасно: окно могли закрыть прямо сейчас
-                if tree_exists and tree.winfo_exists():
-                    try:
-                        tree.insert(
-                            "", "end", iid=iid, tags=(row_tag,) if row_tag else (),
-                            values=(ts_disp, month, material, action, amt, note)
-                        )
-                        cnt += 1
-                    except tk.TclError:
-                        # диалог закрылся в момент вставки — тихо выходим из цикла
-                        break
-
-
-
-        if status_var is not None and stock_win_alive:
-            status_var.set(f"Kirjeid logis: {cnt}")
-            
     def _update_negative_highlight(self):
         """Покрасить отрицательные остатки и показать предупреждение в статусе."""
-        from decimal import Decimal, InvalidOperation
-
         any_negative = False
         for name, cfg in self.materials_cfg.items():
             var = cfg.get("remain_m3")
             ent = cfg.get("remain_entry")
             if not var or not ent:
                 continue
-            raw = (var.get() or "0").replace(",", ".").strip()
             try:
-                val = Decimal(raw)
-            except (InvalidOperation, TypeError):
-                val = Decimal("0")
+                val = parse_units(var.get() or "0")
+            except ValueError:
+                val = 0
 
             if val < 0:
                 any_negative = True
@@ -1066,10 +1026,13 @@ class MainWindow(tk.Frame):
         """Включить/выключить кнопку 'Рассчитать' в зависимости от закрытого месяца."""
         if not hasattr(self, "_calc_btn"):
             return
-        data = self._load_stock_data()
-        closed = set(data.get("closed_months", []))
+        # пока PDF разбираются (или снимок сеанса не сверен), итоги неполные — фиксировать месяц нельзя
+        if self._parse_worker is not None or self._awaiting_parse:
+            self._calc_btn.configure(state="disabled")
+            return
         mkey = self._month_key()
-        if mkey in closed:
+        # из памяти, без чтения файла склада
+        if self.state.is_month_closed(mkey):
             self._calc_btn.configure(state="disabled")
             self.status_var.set(f"Kuu {mkey} on suletud: arvestus on juba tehtud.")
         else:
@@ -1077,28 +1040,27 @@ class MainWindow(tk.Frame):
 
     def _apply_stub(self):
         """Фиксируем расчёт месяца: пишем month_calc в журнал, закрываем месяц."""
-        from decimal import Decimal, ROUND_HALF_UP
-        import datetime as _dt
-
         mkey = self._month_key()
         data = self._load_stock_data()
 
         # Если месяц уже закрыт — не даём повторно
-        if mkey in set(data.get("closed_months", [])):
+        if is_month_closed(data, mkey):
             messagebox.showinfo("Arvestus on juba tehtud", f"Kuu {mkey} on suletud. Arvestus on juba tehtud.")
             self._update_calc_button_state()
             return
 
         # Берём рассчитанные значения из правого блока (конвертация, м²)
-        def _get(name: str) -> Decimal:
+        if self._calc_after is not None:
+            self._calc_m2()   # пересчёт по толщине пилы ещё ждёт паузы в наборе
+        def _get(name: str) -> int:
+            # сотые м²
             var = self.conv_totals.get(name)
             if not var:
-                return Decimal("0")
-            raw = (var.get() or "0").replace(",", ".").strip()
+                return 0
             try:
-                return Decimal(raw)
-            except Exception:
-                return Decimal("0")
+                return parse_units(var.get() or "0")
+            except ValueError:
+                return 0
 
         valge = _get("POM Valge")
         must  = _get("POM Must")
@@ -1108,39 +1070,11 @@ class MainWindow(tk.Frame):
             messagebox.showwarning("Andmed puuduvad", "Valitud kuu kohta ei ole materjale mahakandmiseks.")
             return
 
-        # Запишем операции month_calc (только ненулевые)
-        ts_now = _dt.datetime.now().isoformat(timespec="seconds")
-        note = f"Auto: kuu {mkey} arvestus"
-
-        if valge > 0:
-            data["ledger"].append({
-                "ts": ts_now,
-                "month": mkey,
-                "material": "POM Valge",
-                "type": "month_calc",
-                "amount_m2": float(valge.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)),
-                "note": note
-            })
-        if must > 0:
-            data["ledger"].append({
-                "ts": ts_now,
-                "month": mkey,
-                "material": "POM Must",
-                "type": "month_calc",
-                "amount_m2": float(must.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)),
-                "note": note
-            })
-
-        # Закрываем месяц, если что-то записали
-        if "closed_months" not in data:
-            data["closed_months"] = []
-        if any(r for r in data["ledger"] if r.get("ts") == ts_now and r.get("type") == "month_calc"):
-            if mkey not in data["closed_months"]:
-                data["closed_months"].append(mkey)
-
-        # Пересчёт остатков и сохранение
-        self._recompute_balances_from_ledger(data)
-        self._save_stock_data(data)
+        # Запишем операции month_calc (только ненулевые) и закроем месяц
+        data = self.state.commit(close_month_events(mkey, {"POM Valge": valge, "POM Must": must}))
+
+        # Остатки уже обновлены по дельтам — только показать
+        self._show_balances(data)
         self._update_negative_highlight()
         self._save_config()
 
@@ -1151,8 +1085,15 @@ class MainWindow(tk.Frame):
 
     def _on_exit(self):
         # При выходе всегда сохраняем last_month и текущий pdf_dir
+        # разбор не закончен — снимок был бы неполным (после _cancel_parse этого уже не видно)
+        parsing = self._parse_worker is not None
+        self._cancel_parse()
+        if self._watcher is not None:
+            self._watcher.stop()
         try:
             self._save_config()
+            if not parsing:
+                self._save_session()
         finally:
             self.master.destroy()
 
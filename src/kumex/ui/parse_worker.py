@@ -0,0 +1,114 @@
+"""
+Фоновый разбор PDF: отдельный поток + очередь сообщений для GUI.
+
+Поток ничего не знает о Tkinter — он только кладёт пачки строк в очередь,
+а главное окно забирает их через after() и само обновляет виджеты.
+"""
+import queue
+import threading
+
+from kumex.io.pdf_reader import read_pdf_text, read_pdf_texts
+
+
+class ParseWorker(threading.Thread):
+    """Разбирает файлы месяца и отдаёт строки пачками в порядке списка files.
+
+    lookup(path) -> rows | None — готовые строки (кэш) или None;
+    ingest(path, data) -> rows  — разбор извлечённого (и запись в кэш).
+    Для промахов кэша reader(path, profile) (текст или слова с координатами)
+    вызывается пулом процессов (workers) по профилю извлечения profile
+    (см. kumex.io.pdf_reader.PdfProfile).
+
+    Сообщения в очереди: ("rows", done, files) и финальное ("done", done, files),
+    где files — [(path, rows), ...] в порядке списка.
+    """
+
+    def __init__(self, files, lookup, ingest, workers=None, profile=None, batch_size: int = 25,
+                 reader=read_pdf_text):
+        super().__init__(daemon=True)
+        self.files = list(files)
+        self.lookup = lookup
+        self.ingest = ingest
+        self.workers = workers
+        self.profile = profile
+        self.reader = reader
+        self.batch_size = batch_size
+        self.errors = []                  # [(path, текст ошибки)]
+        self.queue = queue.Queue()
+        self._cancel = threading.Event()
+        # результаты, пришедшие раньше предыдущих файлов, ждут своей очереди
+        self._ready = {}
+        self._next = 0
+        self._batch = []
+        self._batch_rows = 0
+
+    @property
+    def total(self) -> int:
+        return len(self.files)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def _emit(self, index: int, rows: list):
+        self._ready[index] = rows
+        while self._next in self._ready:
+            rows = self._ready.pop(self._next)
+            self._batch.append((self.files[self._next], rows))
+            self._batch_rows += len(rows)
+            self._next += 1
+        if self._batch_rows >= self.batch_size:
+            self.queue.put(("rows", self._next, self._batch))
+            self._batch = []
+            self._batch_rows = 0
+
+    def run(self):
+        misses = []
+        for i, p in enumerate(self.files):
+            if self._cancel.is_set():
+                return
+            try:
+                rows = self.lookup(p)
+            except Exception:
+                rows = None
+            if rows is None:
+                misses.append(i)
+            else:
+                self._emit(i, rows)
+
+        if misses:
+            index_of = {str(self.files[i]): i for i in misses}
+            results = read_pdf_texts(
+                [self.files[i] for i in misses], workers=self.workers, profile=self.profile,
+                reader=self.reader,
+            )
+            try:
+                for path, data, error in results:
+                    if self._cancel.is_set():
+                        return
+                    rows = []
+                    if error is not None:
+                        # битый PDF не должен останавливать весь месяц
+                        self.errors.append((path, error))
+                    else:
+                        try:
+                            rows = self.ingest(path, data)
+                        except Exception as e:
+                            self.errors.append((path, f"{type(e).__name__}: {e}"))
+                    self._emit(index_of[path], rows)
+            finally:
+                results.close()
+
+        if not self._cancel.is_set():
+            self.queue.put(("done", self._next, self._batch))
+
+    def drain(self):
+        """Забрать все накопившиеся сообщения без ожидания."""
+        out = []
+        while True:
+            try:
+                out.append(self.queue.get_nowait())
+            except queue.Empty:
+                return out
@@ -1,3 +1,314 @@
 """
 Отдельные вкладки/экраны GUI (будут добавляться по мере роста).
 """
+import datetime as _dt
+import tkinter as tk
+from tkinter import ttk
+
+from kumex.core.fixed import format_units, parse_units
+from kumex.core.parser import MATERIALS
+
+ALL = "Kõik"
+
+_ACTIONS = {"manual_add": "Täiendus", "manual_sub": "Mahakandmine", "month_calc": "Kuu arvestus"}
+_TAGS = {"manual_add": "t_add", "manual_sub": "t_sub", "month_calc": "t_month"}
+
+
+def _amount_units(v) -> int:
+    try:
+        return parse_units(v or 0)
+    except ValueError:
+        return 0
+
+
+def _fmt_ts(ts: str) -> str:
+    # ISO -> читабельный вид
+    try:
+        if "T" in ts:
+            return _dt.datetime.fromisoformat(ts).strftime("%Y-%m-%d %H:%M:%S")
+    except Exception:
+        pass
+    return ts
+
+
+def ledger_row(rec: dict) -> tuple:
+    """(values, tag) строки таблицы журнала для записи ledger."""
+    typ = (rec.get("type", "") or "").lower()
+    values = (
+        _fmt_ts(rec.get("ts") or ""),
+        rec.get("month", ""),
+        rec.get("material", ""),
+        _ACTIONS.get(typ, rec.get("type", "")),
+        format_units(_amount_units(rec.get("amount_m2", 0))),
+        rec.get("note", ""),
+    )
+    return values, _TAGS.get(typ, "")
+
+
+def record_meta(rec: dict) -> dict:
+    """«Сырые» значения записи для отмены операции (amount — сотые м²)."""
+    amount = _amount_units(rec.get("amount_m2", 0))
+    return {
+        "ts": rec.get("ts") or "",
+        "month": rec.get("month", ""),
+        "material": rec.get("material", ""),
+        "type": (rec.get("type", "") or "").lower(),
+        "amount": amount,
+        "note": rec.get("note", ""),
+    }
+
+
+class LedgerView(ttk.Frame):
+    """Журнал склада с виртуальной прокруткой и фильтром по месяцу/материалу.
+
+    В Treeview живут только видимые строки (окно над списком индексов
+    отфильтрованных записей); прокрутка меняет значения этих строк.
+    Список ledger берётся из состояния в памяти: новые записи в конце
+    добавляются в индекс инкрементально, без перерисовки всего журнала.
+    """
+
+    COLUMNS = ("ts", "month", "material", "action", "amount", "note")
+
+    def __init__(self, master, rows: int = 12):
+        super().__init__(master)
+        self.rows = rows
+        self._ledger = []
+        self._seen = 0          # сколько записей ledger уже разобрано в индекс
+        self._idx = []          # индексы записей, прошедших фильтр
+        self._months = set()
+        self._top = 0
+
+        bar = ttk.Frame(self)
+        bar.pack(fill="x")
+        self.month_var = tk.StringVar(value=ALL)
+        self.material_var = tk.StringVar(value=ALL)
+        ttk.Label(bar, text="Kuu:").pack(side="left")
+        self._month_box = ttk.Combobox(bar, textvariable=self.month_var, state="readonly",
+                                       values=(ALL,), width=9)
+        self._month_box.pack(side="left", padx=(4, 12))
+        ttk.Label(bar, text="Materjal:").pack(side="left")
+        ttk.Combobox(bar, textvariable=self.material_var, state="readonly",
+                     values=(ALL,) + MATERIALS, width=12).pack(side="left", padx=(4, 0))
+        self.month_var.trace_add("write", lambda *_: self._refilter())
+        self.material_var.trace_add("write", lambda *_: self._refilter())
+
+        body = ttk.Frame(self)
+        body.pack(fill="both", expand=True, pady=(6, 0))
+        self.tree = ttk.Treeview(body, columns=self.COLUMNS, show="headings", height=rows,
+                                 selectmode="browse")
+        for col, text, width, anchor in (
+                ("ts", "Kuupäev/aeg", 140, "center"),
+                ("month", "Kuu", 80, "center"),
+                ("material", "Materjal", 120, "w"),
+                ("action", "Toiming", 120, "w"),
+                ("amount", "m²", 80, "center"),
+                ("note", "Kommentaar", 220, "w")):
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=width, anchor=anchor)
+
+        # Цветовые теги для строк журнала
+        self.tree.tag_configure("t_add",   foreground="#0A7D00")  # зелёный  (пополнение)
+        self.tree.tag_configure("t_sub",   foreground="#A40000")  # красный  (списание)
+        self.tree.tag_configure("t_month", foreground="#004A9F")  # синий    (расчёт месяца)
+
+        self.scroll = ttk.Scrollbar(body, orient="vertical", command=self._on_scrollbar)
+        self.tree.pack(side="left", fill="both", expand=True)
+        self.scroll.pack(side="left", fill="y")
+
+        self.tree.bind("<MouseWheel>", self._on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self._scroll_by(-3))
+        self.tree.bind("<Button-5>", lambda e: self._scroll_by(3))
+        self.tree.bind("<Up>", self._on_key)
+        self.tree.bind("<Down>", self._on_key)
+        self.tree.bind("<Prior>", lambda e: self._scroll_by(-self.rows) or "break")
+        self.tree.bind("<Next>", lambda e: self._scroll_by(self.rows) or "break")
+        self.tree.bind("<Configure>", self._on_resize)
+
+    # ---------- данные ----------
+
+    @property
+    def total(self) -> int:
+        return len(self._ledger)
+
+    @property
+    def shown(self) -> int:
+        return len(self._idx)
+
+    def _match(self, rec: dict) -> bool:
+        month, mat = self.month_var.get(), self.material_var.get()
+        return (month == ALL or rec.get("month") == month) and (mat == ALL or rec.get("material") == mat)
+
+    def sync(self, ledger: list):
+        """Показать ledger; если это тот же список и он только вырос — дописать хвост."""
+        if ledger is not self._ledger or len(ledger) < self._seen:
+            self._ledger = ledger
+            self._seen = 0
+            self._idx = []
+            self._months = set()
+            self._top = 0
+            self.tree.selection_set(())
+        at_end = self._top + self.rows >= len(self._idx)
+        for i in range(self._seen, len(ledger)):
+            rec = ledger[i]
+            self._months.add(rec.get("month", ""))
+            if self._match(rec):
+                self._idx.append(i)
+        self._seen = len(ledger)
+        self._month_box.configure(values=(ALL,) + tuple(sorted(self._months, reverse=True)))
+        if at_end and self._top > 0:
+            # смотрели конец журнала — остаёмся на нём
+            self._top = max(0, len(self._idx) - self.rows)
+        self._render()
+
+    def _refilter(self):
+        # фильтр по уже загруженному списку, файл не перечитывается
+        self._idx = [i for i in range(self._seen) if self._match(self._ledger[i])]
+        self._top = 0
+        self.tree.selection_set(())
+        self._render()
+        self.event_generate("<<LedgerFilterChanged>>")
+
+    def selected(self):
+        """Метаданные выбранной записи (см. record_meta) или None."""
+        sel = self.tree.selection()
+        if not sel:
+            return None
+        pos = self._top + int(sel[0])
+        if pos >= len(self._idx):
+            return None
+        return record_meta(self._ledger[self._idx[pos]])
+
+    # ---------- отрисовка видимого окна ----------
+
+    def _render(self):
+        self._top = max(0, min(self._top, len(self._idx) - self.rows))
+        visible = self._idx[self._top:self._top + self.rows]
+        for slot in range(max(len(visible), len(self.tree.get_children()))):
+            iid = str(slot)
+            if slot >= len(visible):
+                self.tree.delete(iid)
+                continue
+            values, tag = ledger_row(self._ledger[visible[slot]])
+            tags = (tag,) if tag else ()
+            if self.tree.exists(iid):
+                self.tree.item(iid, values=values, tags=tags)
+            else:
+                self.tree.insert("", "end", iid=iid, values=values, tags=tags)
+        n = len(self._idx)
+        if n <= self.rows:
+            self.scroll.set(0.0, 1.0)
+        else:
+            self.scroll.set(self._top / n, (self._top + self.rows) / n)
+
+    def _scroll_to(self, top: int):
+        top = max(0, min(top, len(self._idx) - self.rows))
+        if top == self._top:
+            return
+        # выделение остаётся на той же записи, пока она видна
+        sel = self.tree.selection()
+        pos = self._top + int(sel[0]) if sel else None
+        self._top = top
+        self._render()
+        self.tree.selection_set(())
+        if pos is not None and top <= pos < top + self.rows:
+            self.tree.selection_set(str(pos - top))
+
+    def _scroll_by(self, delta: int):
+        self._scroll_to(self._top + delta)
+
+    def _on_scrollbar(self, action, *args):
+        if action == "moveto":
+            self._scroll_to(round(float(args[0]) * len(self._idx)))
+        elif action == "scroll":
+            step = int(args[0]) * (self.rows if args[1] == "pages" else 1)
+            self._scroll_by(step)
+
+    def _on_wheel(self, event):
+        self._scroll_by(-3 if event.delta > 0 else 3)
+        return "break"
+
+    def _on_key(self, event):
+        # стрелки на краю видимого окна прокручивают журнал
+        sel = self.tree.selection()
+        if not sel:
+            return None
+        slot = int(sel[0])
+        if event.keysym == "Up" and slot == 0 and self._top > 0:
+            self._scroll_by(-1)
+            self.tree.selection_set("0")
+            return "break"
+        visible = len(self.tree.get_children())
+        if event.keysym == "Down" and slot == visible - 1 and self._top + visible < len(self._idx):
+            self._scroll_by(1)
+            self.tree.selection_set(str(visible - 1))
+            return "break"
+        return None
+
+    def _on_resize(self, event):
+        # число видимых строк по высоте виджета (шапка ≈ полторы строки)
+        style = ttk.Style(self)
+        try:
+            rh = int(style.lookup("Treeview", "rowheight") or 20)
+        except (TypeError, ValueError):
+            rh = 20
+        rows = max(1, int((event.height - rh * 1.5) // rh))
+        if rows != self.rows:
+            self.rows = rows
+            self._render()
+
+
+class KeyedTreeUpdater:
+    """Обновление плоского Treeview по ключам строк вместо полной перерисовки.
+
+    Ключи подаются в порядке сортировки (begin → feed … → finish): строки с тем
+    же ключом остаются на месте (значения меняются, только если отличаются),
+    новые вставляются в нужную позицию, исчезнувшие удаляются.
+    """
+
+    def __init__(self, tree):
+        self.tree = tree
+        self._keys = []         # ключи в порядке строк таблицы
+        self._iid = {}
+        self._vals = {}
+        self._old = None        # прежние ключи на время обновления
+        self._pos = 0
+        self._new = []
+
+    def __len__(self) -> int:
+        return len(self._keys) if self._old is None else len(self._new) + len(self._old) - self._pos
+
+    def _drop(self, key):
+        self.tree.delete(self._iid.pop(key))
+        del self._vals[key]
+
+    def begin(self):
+        if self._old is not None:
+            # прошлое обновление прервано: в таблице уже новые строки + остаток старых
+            self._keys = self._new + self._old[self._pos:]
+        self._old = self._keys
+        self._pos = 0
+        self._new = []
+
+    def feed(self, items):
+        """items — [(key, values), ...] по возрастанию ключа, продолжая предыдущие."""
+        old = self._old
+        for key, values in items:
+            while self._pos < len(old) and old[self._pos] < key:
+                self._drop(old[self._pos])
+                self._pos += 1
+            if self._pos < len(old) and old[self._pos] == key:
+                self._pos += 1
+                if self._vals[key] != values:
+                    self.tree.item(self._iid[key], values=values)
+                    self._vals[key] = values
+            else:
+                self._iid[key] = self.tree.insert("", len(self._new), values=values)
+                self._vals[key] = values
+            self._new.append(key)
+
+    def finish(self):
+        for key in self._old[self._pos:]:
+            self._drop(key)
+        self._keys = self._new
+        self._old = None
+        self._new = []
@@ -0,0 +1,91 @@
+"""
+Фиксированная точка (kumex.core.fixed) и итоги RowStore против эталона на Decimal.
+"""
+import random
+from decimal import Decimal, ROUND_HALF_UP
+
+import pytest
+
+from kumex.core.aggregator import plate_sides
+from kumex.core.fixed import div_round, format_units, parse_units
+from kumex.core.parser import MATERIALS, ParsedRow
+from kumex.core.row_store import RowStore
+
+
+def _ref_units(value) -> int:
+    d = Decimal(str(value).strip().replace(",", "."))
+    return int((d * 100).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+@pytest.mark.parametrize("value, units", [
+    ("0.005", 1), ("-0.005", -1), ("0.015", 2), ("1.125", 113), ("2.675", 268),
+    ("0.0049999", 0), ("-1.995", -200), ("12,5", 1250), (".5", 50), ("7.", 700),
+    (0.005, 1), (2.675, 268), (-0.125, -13), (1e-05, 0), (3, 300), (Decimal("0.995"), 100),
+])
+def test_parse_units_half_way(value, units):
+    assert parse_units(value) == units
+
+
+@pytest.mark.parametrize("value", ["", "abc", "1.2.3", "nan", "inf", "-", "."])
+def test_parse_units_rejects_garbage(value):
+    with pytest.raises(ValueError):
+        parse_units(value)
+
+
+def test_parse_units_matches_decimal_on_random_values():
+    rnd = random.Random(24)
+    for _ in range(20_000):
+        cents = rnd.randint(-10**9, 10**9)
+        # ровно половина сотой и рядом с ней — самые опасные для float-пути
+        value = cents / 100 + rnd.choice((0, 0.005, -0.005, 0.004999, 0.005001))
+        assert parse_units(value) == _ref_units(value), value
+        text = f"{value:.{rnd.randint(0, 6)}f}"
+        assert parse_units(text) == _ref_units(text), text
+
+
+def test_div_round_half_away_from_zero():
+    rnd = random.Random(1)
+    for _ in range(20_000):
+        den = rnd.randint(1, 10**6)
+        num = rnd.randint(-10**9, 10**9)
+        if rnd.random() < 0.3:
+            # ровно x.5
+            den = 2 * rnd.randint(1, 5 * 10**5)
+            num = (2 * rnd.randint(-10**4, 10**4) + 1) * (den // 2)
+        ref = (Decimal(num) / Decimal(den)).quantize(Decimal(1), rounding=ROUND_HALF_UP)
+        assert div_round(num, den) == int(ref), (num, den)
+
+
+def test_format_units_roundtrip():
+    for units in (0, 1, -1, 99, 100, -12345, 10**12):
+        assert parse_units(format_units(units)) == units
+
+
+def _ref_totals(rows, kerf: Decimal) -> dict:
+    """Эталон: Σ(A+k)(B+k)·q по строкам в Decimal, округление до 0.01 м² в конце."""
+    totals = {name: Decimal(0) for name in MATERIALS}
+    for row in rows:
+        sides = plate_sides(row.desc)
+        if row.material not in totals or sides is None:
+            continue
+        a, b = sides
+        totals[row.material] += (Decimal(a) + kerf) * (Decimal(b) + kerf) / 1_000_000 * row.qty
+    return {name: int((v * 100).to_integral_value(rounding=ROUND_HALF_UP)) for name, v in totals.items()}
+
+
+@pytest.mark.parametrize("kerf", ["0", "1", "2.5", "0.001", "3.333"])
+def test_row_store_totals_match_per_row_formula(kerf):
+    rnd = random.Random(kerf)
+    rows = []
+    for i in range(2_000):
+        a, b = rnd.randint(5, 2000), rnd.randint(5, 2000)
+        desc = rnd.choice((f"52*{a}*{b} valge POM", f"{a}x{b}x52mm POM Must", f"{a}*{b} PET", "Transport"))
+        mat = rnd.choice(MATERIALS + ("",))
+        rows.append(ParsedRow(desc=desc, qty=rnd.randint(1, 500), po=str(i % 17), material=mat, line=i))
+    assert RowStore(rows).totals(Decimal(kerf)) == _ref_totals(rows, Decimal(kerf))
+
+
+def test_row_store_roundtrip_rows():
+    rows = [ParsedRow(desc="52*100*200 valge POM", qty=3, po="1", date="1.01.2025", material="POM Valge", line=4),
+            ParsedRow(desc="Transport", qty=1, po="2", material="", line=9)]
+    assert list(RowStore(rows)) == rows
@@ -0,0 +1,119 @@
+"""
+Остатки склада по дельтам (kumex.core.ledger) против полного пересчёта журнала.
+"""
+import copy
+import random
+
+from kumex.core.ledger import (
+    append_event, apply_event, close_month_events, current_balances, normalize_stock_data,
+    recompute_balances, replay_balances, set_checkpoint, verify_balances,
+)
+from kumex.core.parser import MATERIALS
+from kumex.io.ledger_store import LedgerStore
+from kumex.io.state_repo import StateRepository
+
+
+def _manual(month, mat, units, sign=1):
+    return append_event({
+        "ts": "2025-01-01T00:00:00", "month": month, "material": mat,
+        "type": "manual_add" if sign > 0 else "manual_sub",
+        "amount_m2": units / 100, "note": "test",
+    })
+
+
+def _random_ops(rnd, n):
+    """Смесь операций: пополнения/списания, закрытие и удаление расчёта месяцев."""
+    months = [f"2025-{m:02d}" for m in range(1, 7)]
+    for _ in range(n):
+        kind = rnd.random()
+        month = rnd.choice(months)
+        if kind < 0.5:
+            yield [_manual(month, rnd.choice(MATERIALS), rnd.randint(1, 100_000), rnd.choice((1, -1)))]
+        elif kind < 0.75:
+            totals = {mat: rnd.choice((0, rnd.randint(1, 50_000))) for mat in MATERIALS}
+            yield close_month_events(month, totals)
+        elif kind < 0.9:
+            yield [{"op": "delete_month_calc", "month": month}]
+        else:
+            yield "checkpoint"
+
+
+def _full_recompute(data) -> dict:
+    return recompute_balances(copy.deepcopy(data))
+
+
+def test_event_replay_matches_full_recompute():
+    rnd = random.Random(8)
+    data = normalize_stock_data({})
+    recompute_balances(data)
+    for ops in _random_ops(rnd, 300):
+        if ops == "checkpoint":
+            set_checkpoint(data)
+        else:
+            for ev in ops:
+                apply_event(data, ev)
+        assert current_balances(data) == _full_recompute(data)
+        assert verify_balances(data)
+
+
+def test_checkpoint_shift_after_deleting_older_month():
+    data = normalize_stock_data({})
+    recompute_balances(data)
+    apply_event(data, _manual("2025-01", "POM Valge", 100_00))
+    for ev in close_month_events("2025-01", {"POM Valge": 12_34, "POM Must": 5_00}):
+        apply_event(data, ev)
+    for ev in close_month_events("2025-02", {"POM Valge": 1_01}):
+        apply_event(data, ev)
+    set_checkpoint(data)
+    apply_event(data, _manual("2025-03", "POM Must", 7_50))
+
+    # удаляется месяц, записи которого лежат до checkpoint
+    apply_event(data, {"op": "delete_month_calc", "month": "2025-01"})
+
+    cp = data["checkpoint"]
+    ledger = data["ledger"]
+    assert cp["ledger_len"] == 2          # пополнение + month_calc за 2025-02
+    assert replay_balances(ledger[:cp["ledger_len"]]) == replay_balances([], cp["balances"])
+    assert verify_balances(data)
+    assert current_balances(data) == {"POM Valge": 100_00 - 1_01, "POM Must": 7_50}
+    assert "2025-01" not in data["closed_months"]
+
+
+def test_verify_balances_detects_mismatch():
+    data = normalize_stock_data({})
+    recompute_balances(data)
+    apply_event(data, _manual("2025-01", "POM Valge", 10_00))
+    set_checkpoint(data)
+    data["balances"]["POM Valge"] = "9.99"
+    assert not verify_balances(data)
+
+
+def test_store_journal_and_snapshot_roundtrip(tmp_path):
+    rnd = random.Random(24)
+    store = LedgerStore(tmp_path / "kumex_stock.json", compact_every=7)
+    repo = StateRepository(store)
+    for ops in _random_ops(rnd, 200):
+        if ops == "checkpoint":
+            repo.save_snapshot()
+        else:
+            repo.commit(ops)
+    data = repo.get()
+    assert current_balances(data) == _full_recompute(data)
+
+    # с диска (снимок + журнал) — то же состояние
+    loaded = LedgerStore(tmp_path / "kumex_stock.json").load()
+    assert current_balances(loaded) == current_balances(data)
+    assert loaded["ledger"] == data["ledger"]
+    assert loaded["closed_months"] == data["closed_months"]
+    assert verify_balances(loaded)
+
+
+def test_missing_balances_rebuilt_and_saved_once(tmp_path):
+    import json
+
+    path = tmp_path / "kumex_stock.json"
+    path.write_text(json.dumps({"ledger": [_manual("2025-01", "POM Must", 3_00)["rec"]]}), encoding="utf-8")
+    repo = StateRepository(LedgerStore(path))
+    assert current_balances(repo.get())["POM Must"] == 3_00
+    assert repo.save_if_dirty()
+    assert not StateRepository(LedgerStore(path)).save_if_dirty()